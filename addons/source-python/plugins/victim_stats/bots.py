@@ -0,0 +1,52 @@
+# ../victim_stats/bots.py
+
+"""Tracks which userids belong to bots without touching their entities."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Source.Python
+from filters.players import PlayerIter
+
+# =============================================================================
+# >> ALL DECLARATION
+# =============================================================================
+__all__ = (
+    "bot_userids",
+)
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class _BotUserids(dict):
+    """
+    Stores the team of each bot on the server by its userid.
+
+    Hits and kills between bots can skip the player dictionary, so their
+    teams are kept here to still add them to the team totals.
+    """
+
+    def refresh(self):
+        """Replace the stored userids with the bots currently connected."""
+        self.clear()
+        self.update(
+            (player.userid, player.team)
+            for player in PlayerIter(is_filters=["bot"])
+        )
+
+    def add(self, userid):
+        """Store the userid of a bot that has not yet joined a team."""
+        self[userid] = 0
+
+    def set_team(self, userid, team):
+        """Update the team of the bot with the given userid."""
+        if userid in self:
+            self[userid] = team
+
+    def is_bot_pair(self, attacker, victim):
+        """Return whether both userids belong to bots."""
+        return attacker in self and victim in self
+
+
+bot_userids = _BotUserids()
@@ -6,7 +6,15 @@
 # >> IMPORTS
 # =============================================================================
 # Source.Python
-from colors import DARK_BLUE, DARK_RED, LIGHT_BLUE, LIGHT_RED
+from colors import (
+    DARK_BLUE,
+    DARK_RED,
+    GRAY,
+    LIGHT_BLUE,
+    LIGHT_RED,
+    ORANGE,
+    YELLOW,
+)
 from core import GAME_NAME
 
 # =============================================================================
@@ -16,6 +24,9 @@ __all__ = (
     "ATTACKER_COLOR",
     "KILLED_COLOR",
     "KILLER_COLOR",
+    "LEADERBOARD_COLOR",
+    "TEAM_SUMMARY_COLOR",
+    "TIMELINE_COLOR",
     "WOUNDED_COLOR",
 )
 
@@ -29,8 +40,14 @@ if GAME_NAME == "csgo":
     WOUNDED_COLOR = "\x0C"
     KILLED_COLOR = "\x0A"
     KILLER_COLOR = "\x02"
+    TIMELINE_COLOR = "\x08"
+    LEADERBOARD_COLOR = "\x10"
+    TEAM_SUMMARY_COLOR = "\x09"
 else:
     ATTACKER_COLOR = DARK_RED
     WOUNDED_COLOR = DARK_BLUE
     KILLED_COLOR = LIGHT_BLUE
     KILLER_COLOR = LIGHT_RED
+    TIMELINE_COLOR = GRAY
+    LEADERBOARD_COLOR = ORANGE
+    TEAM_SUMMARY_COLOR = YELLOW
@@ -16,10 +16,28 @@ from .strings import CONFIG_STRINGS
 # >> ALL DECLARATION
 # =============================================================================
 __all__ = (
+    "chat_messages_per_tick",
     "display_type",
     "display_type_options",
     "distance_type",
     "distance_type_options",
+    "export_interval",
+    "export_port",
+    "heatmap_stats",
+    "hit_timeline_size",
+    "kill_log_size",
+    "load_shedding",
+    "persist_stats",
+    "record_events",
+    "render_workers",
+    "round_end_players_per_tick",
+    "round_end_tick_budget",
+    "round_leaderboard_size",
+    "shed_frame_ratio",
+    "shed_plugin_time",
+    "skip_bot_pairs",
+    "snapshot_on_reload",
+    "team_summary",
 )
 
 
@@ -68,3 +86,133 @@ with ConfigManager(info.name, "vs_") as config:
         distance_type.Options.append(
             f"{_item} - {CONFIG_STRINGS[_item].get_string()}",
         )
+
+    # Create the round end scheduling convars
+    round_end_players_per_tick = config.cvar(
+        name="round_end_players_per_tick",
+        default=4,
+        description=CONFIG_STRINGS["round_end_players_per_tick"],
+    )
+    round_end_tick_budget = config.cvar(
+        name="round_end_tick_budget",
+        default=1.0,
+        description=CONFIG_STRINGS["round_end_tick_budget"],
+    )
+
+    # Create the chat output convar
+    chat_messages_per_tick = config.cvar(
+        name="chat_messages_per_tick",
+        default=32,
+        description=CONFIG_STRINGS["chat_messages_per_tick"],
+    )
+
+    # Create the persistence convar
+    persist_stats = config.cvar(
+        name="persist_stats",
+        default=0,
+        description=CONFIG_STRINGS["persist_stats"],
+    )
+
+    # Create the hit timeline convar
+    hit_timeline_size = config.cvar(
+        name="hit_timeline_size",
+        default=0,
+        description=CONFIG_STRINGS["hit_timeline_size"],
+        min_value=0,
+        max_value=32,
+    )
+
+    # Create the kill log convar
+    kill_log_size = config.cvar(
+        name="kill_log_size",
+        default=8,
+        description=CONFIG_STRINGS["kill_log_size"],
+        min_value=1,
+        max_value=64,
+    )
+
+    # Create the round leaderboard convar
+    round_leaderboard_size = config.cvar(
+        name="round_leaderboard_size",
+        default=3,
+        description=CONFIG_STRINGS["round_leaderboard_size"],
+        min_value=0,
+        max_value=10,
+    )
+
+    # Create the bot tracking convar
+    skip_bot_pairs = config.cvar(
+        name="skip_bot_pairs",
+        default=0,
+        description=CONFIG_STRINGS["skip_bot_pairs"],
+    )
+
+    # Create the reload snapshot convar
+    snapshot_on_reload = config.cvar(
+        name="snapshot_on_reload",
+        default=1,
+        description=CONFIG_STRINGS["snapshot_on_reload"],
+    )
+
+    # Create the stats export convars
+    export_port = config.cvar(
+        name="export_port",
+        default=0,
+        description=CONFIG_STRINGS["export_port"],
+        min_value=0,
+        max_value=65535,
+    )
+    export_interval = config.cvar(
+        name="export_interval",
+        default=1.0,
+        description=CONFIG_STRINGS["export_interval"],
+    )
+
+    # Create the heatmap convar
+    heatmap_stats = config.cvar(
+        name="heatmap_stats",
+        default=0,
+        description=CONFIG_STRINGS["heatmap_stats"],
+    )
+
+    # Create the event recorder convar
+    record_events = config.cvar(
+        name="record_events",
+        default=0,
+        description=CONFIG_STRINGS["record_events"],
+    )
+
+    # Create the message rendering convar
+    render_workers = config.cvar(
+        name="render_workers",
+        default=0,
+        description=CONFIG_STRINGS["render_workers"],
+        min_value=0,
+        max_value=8,
+    )
+
+    # Create the team summary convar
+    team_summary = config.cvar(
+        name="team_summary",
+        default=1,
+        description=CONFIG_STRINGS["team_summary"],
+    )
+
+    # Create the load shedding convars
+    load_shedding = config.cvar(
+        name="load_shedding",
+        default=0,
+        description=CONFIG_STRINGS["load_shedding"],
+    )
+    shed_frame_ratio = config.cvar(
+        name="shed_frame_ratio",
+        default=1.5,
+        description=CONFIG_STRINGS["shed_frame_ratio"],
+        min_value=0,
+    )
+    shed_plugin_time = config.cvar(
+        name="shed_plugin_time",
+        default=2.0,
+        description=CONFIG_STRINGS["shed_plugin_time"],
+        min_value=0,
+    )
@@ -0,0 +1,226 @@
+# ../victim_stats/event_log.py
+
+"""
+Defines the binary event log format and reads it back into events.
+
+This module only uses the standard library, so recordings can be read
+outside of the server, for example to replay them in the benchmarks.
+"""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python
+from pathlib import Path
+from struct import Struct
+from typing import NamedTuple
+
+# =============================================================================
+# >> ALL DECLARATION
+# =============================================================================
+__all__ = (
+    "EVENT_CODES",
+    "HEADER",
+    "MAGIC",
+    "NAME_RECORD",
+    "RECORD",
+    "RECORD_SIZE",
+    "VERSION",
+    "WEAPON_NAME",
+    "read_events",
+)
+
+
+# =============================================================================
+# >> GLOBAL VARIABLES
+# =============================================================================
+MAGIC = b"VSEV"
+VERSION = 1
+
+# Magic, version, record size, seconds per tick and map name
+HEADER = Struct("<4sBHf64s")
+
+# Tick, event code, flags, userid, attacker/index/winner, damage, health,
+# hitgroup, team/reason, weapon id, victim origin and attacker origin
+RECORD = Struct("<iBBHHHHBBH6f")
+RECORD_SIZE = RECORD.size
+
+# Tick, event code, unused flags, weapon id and weapon name
+NAME_RECORD = Struct(f"<iBBH{RECORD_SIZE - 8}s")
+
+# Codes stored for each recorded event
+EVENT_CODES = {
+    "player_connect": 1,
+    "player_disconnect": 2,
+    "player_team": 3,
+    "player_spawn": 4,
+    "weapon_fire": 5,
+    "player_hurt": 6,
+    "player_death": 7,
+    "round_start": 8,
+    "round_end": 9,
+}
+
+# Code of the records that give the name of a weapon id
+WEAPON_NAME = 10
+
+# Bits stored in the flags of each record
+FLAG_BOT = 1
+FLAG_HEADSHOT = 2
+
+_EVENT_NAMES = {code: event_name for event_name, code in EVENT_CODES.items()}
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class _Record(NamedTuple):
+    """The values unpacked from a record."""
+
+    tick: int
+    code: int
+    flags: int
+    userid: int
+    other: int
+    damage: int
+    health: int
+    hitgroup: int
+    extra: int
+    weapon: int
+    victim_x: float
+    victim_y: float
+    victim_z: float
+    attacker_x: float
+    attacker_y: float
+    attacker_z: float
+
+
+# =============================================================================
+# >> FUNCTIONS
+# =============================================================================
+def read_events(path):
+    """
+    Yield each recorded event as a (tick, event name, variables) tuple.
+
+    Player names and network ids are not recorded, so each player is
+    given a generated name and network id based on their index.
+    """
+    with Path(path).open("rb") as open_file:
+        data = memoryview(open_file.read())
+
+    magic, version, record_size = HEADER.unpack_from(data)[:3]
+    if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+        msg = f"'{path}' is not a version {VERSION} event log."
+        raise ValueError(msg)
+
+    weapons = {}
+    for offset in range(HEADER.size, len(data) - RECORD_SIZE + 1, RECORD_SIZE):
+        record = _Record._make(RECORD.unpack_from(data, offset))
+        if record.code == WEAPON_NAME:
+            weapon, name = NAME_RECORD.unpack_from(data, offset)[3:]
+            weapons[weapon] = name.rstrip(b"\0").decode()
+            continue
+
+        yield (
+            record.tick, _EVENT_NAMES[record.code],
+            _get_variables(record, weapons),
+        )
+
+
+# =============================================================================
+# >> HELPER FUNCTIONS
+# =============================================================================
+def _get_variables(record, weapons):
+    """Return the event variables stored in the record."""
+    get_variables = _VARIABLE_GETTERS.get(record.code)
+    if get_variables is None:
+        return {}
+
+    variables = get_variables(record)
+    if "weapon" in variables:
+        variables["weapon"] = weapons.get(variables["weapon"], "")
+    return variables
+
+
+def _get_connect_variables(record):
+    """Return the variables of a player_connect event."""
+    bot = record.flags & FLAG_BOT
+    return {
+        "userid": record.userid,
+        "index": record.other,
+        "name": f"{'Bot' if bot else 'Player'} {record.other}",
+        "networkid": "BOT" if bot else f"STEAM_0:0:{record.other}",
+    }
+
+
+def _get_disconnect_variables(record):
+    """Return the variables of a player_disconnect event."""
+    return {"userid": record.userid, "reason": ""}
+
+
+def _get_team_variables(record):
+    """Return the variables of a player_team event."""
+    return {
+        "userid": record.userid,
+        "team": record.extra,
+        "oldteam": 0,
+        "disconnect": False,
+    }
+
+
+def _get_spawn_variables(record):
+    """Return the variables of a player_spawn event."""
+    return {"userid": record.userid}
+
+
+def _get_fire_variables(record):
+    """Return the variables of a weapon_fire event."""
+    return {
+        "userid": record.userid,
+        "weapon": record.weapon,
+        "silenced": False,
+    }
+
+
+def _get_hurt_variables(record):
+    """Return the variables of a player_hurt event."""
+    return {
+        "userid": record.userid,
+        "attacker": record.other,
+        "health": record.health,
+        "armor": 0,
+        "weapon": record.weapon,
+        "dmg_health": record.damage,
+        "dmg_armor": 0,
+        "hitgroup": record.hitgroup,
+    }
+
+
+def _get_death_variables(record):
+    """Return the variables of a player_death event."""
+    return {
+        "userid": record.userid,
+        "attacker": record.other,
+        "weapon": record.weapon,
+        "headshot": bool(record.flags & FLAG_HEADSHOT),
+        "victim_origin": record[10:13],
+        "attacker_origin": record[13:],
+    }
+
+
+def _get_round_end_variables(record):
+    """Return the variables of a round_end event."""
+    return {"winner": record.other, "reason": record.extra, "message": ""}
+
+
+# Functions that return the variables of the events that have any
+_VARIABLE_GETTERS = {
+    EVENT_CODES["player_connect"]: _get_connect_variables,
+    EVENT_CODES["player_disconnect"]: _get_disconnect_variables,
+    EVENT_CODES["player_team"]: _get_team_variables,
+    EVENT_CODES["player_spawn"]: _get_spawn_variables,
+    EVENT_CODES["weapon_fire"]: _get_fire_variables,
+    EVENT_CODES["player_hurt"]: _get_hurt_variables,
+    EVENT_CODES["player_death"]: _get_death_variables,
+    EVENT_CODES["round_end"]: _get_round_end_variables,
+}
@@ -0,0 +1,193 @@
+# ../victim_stats/export.py
+
+"""Publishes the current stats to be served as JSON on a local port."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Source.Python
+from core import echo_console
+from engines.server import global_vars
+from listeners import on_tick_listener_manager
+from listeners.tick import GameThread
+
+# Plugin
+from .config import export_interval, export_port
+from .info import info
+from .leaderboard import round_leaderboard
+from .players import player_dictionary
+from .storage import stats_store
+from .weapons import weapon_ids
+
+# =============================================================================
+# >> ALL DECLARATION
+# =============================================================================
+__all__ = (
+    "stats_export",
+)
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class _StatsExport:
+    """
+    Publishes the stats on the game thread and serves them off of it.
+
+    The game thread builds a new state from plain lists and dictionaries
+    that are never changed once published. The server thread only ever
+    reads the latest published state, so it never touches the live stats.
+    """
+
+    def __init__(self):
+        """Store the base values."""
+        self.state = None
+        self.server = None
+        self.thread = None
+        self._last_tick = 0
+
+    def start(self):
+        """Start serving if a port is configured and can be bound."""
+        port = int(export_port)
+        if not port or self.server is not None:
+            return
+
+        # Import here so loading the plugin does not import the HTTP server
+        from .export_server import ExportServer  # noqa: PLC0415
+
+        # Leave the stats unexported rather than failing to load
+        try:
+            self.server = ExportServer(port, self)
+        except OSError as error:
+            echo_console(f"{info.name}: cannot export on port {port}: {error}")
+            return
+
+        self.publish()
+        self.thread = GameThread(
+            target=self.server.serve_forever,
+            kwargs={"poll_interval": ExportServer.poll_interval},
+            name=f"{info.name}.export",
+            daemon=True,
+        )
+        self.thread.start()
+        on_tick_listener_manager.register_listener(self._tick)
+
+    def stop(self):
+        """Stop serving and wait for the server thread to finish."""
+        if self.server is None:
+            return
+
+        on_tick_listener_manager.unregister_listener(self._tick)
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.server = None
+        self.thread = None
+        self.state = None
+
+    def publish(self):
+        """Replace the published state with the current stats."""
+        if self.server is None:
+            return
+
+        names = player_dictionary.names
+        self.state = {
+            "map": global_vars.map_name,
+            "round_start": stats_store.round_start,
+            "tick": global_vars.tick_count,
+            "players": [
+                _get_player_state(player)
+                for player in player_dictionary.values()
+            ],
+            "leaderboard": {
+                category.lower(): [
+                    {
+                        "userid": userid,
+                        "name": names.get(userid, ""),
+                        "value": value,
+                    }
+                    for userid, value in totals.iter_top()
+                ]
+                for category, totals in round_leaderboard.iter_categories()
+            },
+        }
+
+    def _tick(self):
+        """Publish the current stats once every configured interval."""
+        tick_count = global_vars.tick_count
+        elapsed = tick_count - self._last_tick
+
+        # The tick count starts over on each map
+        interval = float(export_interval) / global_vars.interval_per_tick
+        if 0 <= elapsed < interval:
+            return
+
+        self._last_tick = tick_count
+        self.publish()
+
+
+stats_export = _StatsExport()
+
+
+# =============================================================================
+# >> HELPER FUNCTIONS
+# =============================================================================
+def _get_player_state(player):
+    """Return a copy of the player's stats made of plain values."""
+    names = player_dictionary.names
+    weapon_names = weapon_ids.names
+    weapons = player.weapons
+    return {
+        "userid": player.userid,
+        "name": player.name,
+        "uniqueid": player.uniqueid,
+        "team": player.team,
+        **{
+            group_name: [
+                {
+                    "userid": userid,
+                    "name": names.get(userid, ""),
+                    "damage": values.damage,
+                    "hits": values.hits,
+                    "hitgroups": values.hitgroups.tolist(),
+                }
+                for userid, values in group.items()
+            ]
+            for group_name, group in (
+                ("taken", player.taken),
+                ("wounded", player.wounded),
+                ("victims", player.victims),
+            )
+        },
+        "killed": [
+            {
+                "userid": userid,
+                "name": names.get(userid, ""),
+                "kills": values.kills,
+                "weapon": values.weapon,
+                "headshot": values.headshot,
+                "distance": values.distance,
+                "headshots": values.headshots,
+                "longest": values.longest,
+                "log": [
+                    {
+                        "weapon": weapon,
+                        "headshot": headshot,
+                        "distance": distance,
+                    }
+                    for weapon, headshot, distance in values
+                ],
+            }
+            for userid, values in player.killed.items()
+        ],
+        "weapons": {
+            weapon_names[weapon]: {
+                "shots": weapons.shots[weapon],
+                "hits": weapons.hits[weapon],
+                "damage": weapons.damage[weapon],
+                "kills": weapons.kills[weapon],
+            }
+            for weapon in range(len(weapons.shots))
+            if weapons.shots[weapon] or weapons.hits[weapon]
+        },
+    }
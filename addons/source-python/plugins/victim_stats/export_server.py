@@ -0,0 +1,146 @@
+# ../victim_stats/export_server.py
+
+"""Answers the HTTP requests for the exported stats."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python
+import json
+import sqlite3
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Plugin
+from .storage import DATABASE_PATH
+
+# =============================================================================
+# >> ALL DECLARATION
+# =============================================================================
+__all__ = (
+    "ExportServer",
+)
+
+
+# =============================================================================
+# >> GLOBAL VARIABLES
+# =============================================================================
+# Only ever listen for local connections
+EXPORT_HOST = "127.0.0.1"
+
+# Default and maximum number of rows returned from the history
+DEFAULT_HISTORY_LIMIT = 100
+MAX_HISTORY_LIMIT = 1000
+
+_PLAYER_HISTORY = {
+    "damage": """
+        SELECT map, round_start, opponent, taken, damage, hits
+        FROM damage WHERE player = ?
+        ORDER BY round_start DESC LIMIT ?
+    """,
+    "kills": """
+        SELECT map, round_start, opponent, kills, weapon, headshot, distance
+        FROM kills WHERE player = ?
+        ORDER BY round_start DESC LIMIT ?
+    """,
+}
+
+_ROUND_HISTORY = """
+    SELECT
+        map, round_start, COUNT(DISTINCT player) AS players,
+        SUM(damage) AS damage, SUM(hits) AS hits
+    FROM damage WHERE taken = 0
+    GROUP BY map, round_start
+    ORDER BY round_start DESC LIMIT ?
+"""
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class ExportServer(HTTPServer):
+    """Serves the state published by the export on the local host."""
+
+    # Seconds between checks for the server being stopped
+    poll_interval = 0.1
+
+    def __init__(self, port, export):
+        """Bind to the port and store the export to read the state from."""
+        super().__init__((EXPORT_HOST, port), _RequestHandler)
+        self.export = export
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Responds to requests for the current state and stored history."""
+
+    def do_GET(self):
+        """Send the JSON for the requested path."""
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/stats":
+            self._send_json(self.server.export.state)
+            return
+
+        if url.path != "/history":
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        try:
+            limit = int(query.get("limit", [DEFAULT_HISTORY_LIMIT])[0])
+        except ValueError:
+            limit = 0
+
+        # A negative limit would make SQLite return every row
+        if limit < 1:
+            self.send_error(HTTPStatus.BAD_REQUEST, "Invalid limit")
+            return
+        limit = min(limit, MAX_HISTORY_LIMIT)
+
+        player = query.get("player", [None])[0]
+        try:
+            self._send_json(_get_history(player, limit))
+        except sqlite3.Error as error:
+            self.send_error(HTTPStatus.SERVICE_UNAVAILABLE, str(error))
+
+    def log_message(self, format, *args):  # noqa: A002
+        """Do not print every request to the server console."""
+
+    def _send_json(self, value):
+        """Send the value encoded as JSON."""
+        body = json.dumps(value).encode()
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+# =============================================================================
+# >> HELPER FUNCTIONS
+# =============================================================================
+def _get_history(player, limit):
+    """Return the stored rows for the player or the totals of each round."""
+    if not DATABASE_PATH.isfile():
+        return {}
+
+    connection = sqlite3.connect(f"file:{DATABASE_PATH}?mode=ro", uri=True)
+    connection.row_factory = sqlite3.Row
+    try:
+        if player is None:
+            return {
+                "rounds": [
+                    dict(row)
+                    for row in connection.execute(_ROUND_HISTORY, (limit,))
+                ],
+            }
+
+        return {
+            table: [
+                dict(row)
+                for row in connection.execute(statement, (player, limit))
+            ]
+            for table, statement in _PLAYER_HISTORY.items()
+        }
+    finally:
+        connection.close()
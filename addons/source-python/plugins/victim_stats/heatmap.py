@@ -0,0 +1,397 @@
+# ../victim_stats/heatmap.py
+
+"""
+Aggregates hits and damage by player, weapon and hitgroup over matches.
+
+The totals are stored as dense NumPy arrays in memory-mapped files. NumPy
+is optional and only imported on the heatmap's writer thread, so the
+heatmap is simply unavailable on servers without it.
+"""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python
+import json
+import sys
+from array import array
+from importlib.util import find_spec
+from pathlib import Path
+from queue import Queue
+
+# Source.Python
+from listeners.tick import GameThread
+from paths import PLUGIN_DATA_PATH
+
+# Plugin
+from .info import info
+from .templates import MAX_HITGROUPS, get_hitgroup
+from .weapons import weapon_ids
+
+# =============================================================================
+# >> ALL DECLARATION
+# =============================================================================
+__all__ = (
+    "HEATMAP_PATH",
+    "stats_heatmap",
+)
+
+
+# =============================================================================
+# >> GLOBAL VARIABLES
+# =============================================================================
+HEATMAP_PATH = PLUGIN_DATA_PATH / info.name / "heatmap"
+
+# Number of players and weapons to make room for when the arrays are created
+INITIAL_PLAYERS = 256
+INITIAL_WEAPONS = 64
+
+# Hitgroup id of the head
+HEAD_HITGROUP = 1
+
+# Queued to tell the writer to stop
+_STOP = object()
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class _HeatmapWriter(GameThread):
+    """Runs the queued file work for the heatmap."""
+
+    def __init__(self, heatmap):
+        """Store the heatmap to run the work for."""
+        super().__init__(name=f"{info.name}.heatmap", daemon=True)
+        self.heatmap = heatmap
+
+    def run(self):
+        """Run each queued job until told to stop."""
+        heatmap = self.heatmap
+        while (job := heatmap.jobs.get()) is not _STOP:
+            function, args = job
+            try:
+                function(*args)
+
+            # Any error is reported and must not stop the writer
+            except Exception:  # noqa: BLE001
+                sys.excepthook(*sys.exc_info())
+            heatmap.finished += 1
+
+
+class _StatsHeatmap:
+    """
+    Collects the round's hits and merges them into the stored arrays.
+
+    During the round, each player's hits and damage are counted in flat
+    arrays indexed by weapon id and hitgroup, so no NumPy code runs for
+    each hit. Merging a round adds all of them with one vectorised add.
+
+    Opening, growing and saving the files is left to a writer thread.
+    The game thread only adds a round itself when the writer is idle and
+    every player and weapon in the round already has room in the arrays.
+    """
+
+    def __init__(self):
+        """Store the base values."""
+        self.available = find_spec("numpy") is not None
+        self.round = {}
+        self.round_names = {}
+        self.names = {}
+        self.hits = None
+        self.damage = None
+        self.players = {}
+        self.weapons = {}
+        self.jobs = Queue()
+        self.writer = None
+        self.queued = 0
+        self.finished = 0
+
+    @property
+    def idle(self):
+        """Return whether the writer has finished all queued work."""
+        return self.queued == self.finished
+
+    def add_hit(self, player, weapon, hitgroup, damage):
+        """Add the hit to the player's counters for this round."""
+        counters = self.round.get(player.uniqueid)
+        if counters is None:
+            size = len(weapon_ids.names) * MAX_HITGROUPS
+            counters = self.round[player.uniqueid] = (
+                array("I", [0]) * size,
+                array("I", [0]) * size,
+            )
+            self.round_names[player.uniqueid] = player.name
+
+        hits, damage_given = counters
+        index = weapon * MAX_HITGROUPS + get_hitgroup(hitgroup)
+        if index >= len(hits):
+            extra = array("I", [0]) * (
+                max(weapon + 1, len(weapon_ids.names)) * MAX_HITGROUPS
+                - len(hits)
+            )
+            hits.extend(extra)
+            damage_given.extend(extra)
+
+        hits[index] += 1
+        damage_given[index] += damage
+
+    def merge(self):
+        """Add the round's counters to the stored arrays."""
+        counters, names = self.round, self.round_names
+        self.round = {}
+        self.round_names = {}
+        if not (counters and self.available):
+            return
+
+        weapons = max(len(hits) for hits, _ in counters.values())
+        weapon_names = weapon_ids.names[:weapons // MAX_HITGROUPS]
+        if self.idle and self._fits(counters, weapon_names):
+            self.names.update(names)
+            self._add(counters, weapon_names)
+            return
+
+        self._submit(self._write, counters, names, weapon_names)
+
+    def flush(self):
+        """Merge the round and have the writer save and close the arrays."""
+        self.merge()
+        if self.writer is not None:
+            self._submit(self._flush)
+
+    def close(self, timeout=5):
+        """Flush everything to disk and stop the writer."""
+        self.flush()
+        writer = self.writer
+        if writer is None:
+            return
+
+        self.writer = None
+        self.jobs.put(_STOP)
+        writer.join(timeout)
+
+    def warm_up(self):
+        """Import NumPy and open the arrays before the first merge."""
+        if self.available:
+            self._submit(self._write, {}, {}, [])
+
+    def iter_report(self, by_weapon, count, min_hits):
+        """
+        Yield the lines of the players or weapons with the top ratios.
+
+        Only players or weapons with at least the given number of hits
+        are included, so a single lucky headshot does not top the list.
+        """
+        if not self.available:
+            yield "NumPy is not installed, the heatmap is unavailable."
+            return
+
+        if not self.idle or self.hits is None:
+            if self.idle:
+                self.warm_up()
+            yield "The heatmap is still being loaded, try again shortly."
+            return
+
+        import numpy as np  # noqa: PLC0415
+
+        players = len(self.players)
+        weapons = len(self.weapons)
+        hits = self.hits[:players, :weapons]
+        damage = self.damage[:players, :weapons]
+        if by_weapon:
+            names = list(self.weapons)
+            hitgroups = hits.sum(axis=0, dtype=np.uint64)
+            totals = damage.sum(axis=(0, 2), dtype=np.uint64)
+        else:
+            names = [
+                self.names.get(uniqueid, uniqueid) for uniqueid in self.players
+            ]
+            hitgroups = hits.sum(axis=1, dtype=np.uint64)
+            totals = damage.sum(axis=(1, 2), dtype=np.uint64)
+
+        total_hits = hitgroups.sum(axis=1)
+        eligible = total_hits >= max(min_hits, 1)
+        ratios = np.divide(
+            hitgroups[:, HEAD_HITGROUP],
+            total_hits,
+            out=np.zeros(len(total_hits)),
+            where=eligible,
+        )
+        averages = np.divide(
+            totals,
+            total_hits,
+            out=np.zeros(len(total_hits)),
+            where=eligible,
+        )
+
+        yield f"{'name':<32}{'hits':>9}{'headshot %':>12}{'dmg/hit':>9}"
+        order = np.argsort(-ratios, kind="stable")
+        for item in order[eligible[order]][:count]:
+            yield (
+                f"{names[item][:31]:<32}{total_hits[item]:>9}"
+                f"{ratios[item] * 100:>12.1f}{averages[item]:>9.1f}"
+            )
+
+    def _submit(self, function, *args):
+        """Queue the function to be run by the writer."""
+        if self.writer is None:
+            self.writer = _HeatmapWriter(self)
+            self.writer.start()
+
+        self.queued += 1
+        self.jobs.put((function, args))
+
+    def _fits(self, counters, weapon_names):
+        """Return whether the arrays already have room for the round."""
+        if self.hits is None:
+            return False
+
+        players = self.players
+        weapons = self.weapons
+        return all(uniqueid in players for uniqueid in counters) and all(
+            name in weapons for name in weapon_names
+        )
+
+    def _add(self, counters, weapon_names):
+        """Add the round's counters to the arrays with a single add."""
+        import numpy as np  # noqa: PLC0415
+
+        rows = self._get_indexes(self.players, counters)
+        columns = self._get_indexes(self.weapons, weapon_names)
+
+        # Copy the round's flat counters into dense arrays
+        shape = (len(counters), len(weapon_names), MAX_HITGROUPS)
+        round_hits = np.zeros(shape, dtype=np.uint32)
+        round_damage = np.zeros(shape, dtype=np.uint32)
+        for row, (hits, damage) in enumerate(counters.values()):
+            length = len(hits) // MAX_HITGROUPS
+            round_hits[row, :length] = np.frombuffer(
+                hits,
+                dtype=np.uint32,
+            ).reshape(length, MAX_HITGROUPS)
+            round_damage[row, :length] = np.frombuffer(
+                damage,
+                dtype=np.uint32,
+            ).reshape(length, MAX_HITGROUPS)
+
+        # Each player and weapon is only listed once, so one add is enough
+        index = np.ix_(rows, columns)
+        self.hits[index] += round_hits
+        self.damage[index] += round_damage
+
+    def _write(self, counters, names, weapon_names):
+        """Open and grow the arrays as needed, then add the round."""
+        import numpy as np  # noqa: PLC0415
+
+        if self.hits is None:
+            self._open(np)
+
+        self.names.update(names)
+        if not counters:
+            return
+
+        known = len(self.players), len(self.weapons)
+        self._get_indexes(self.players, counters)
+        self._get_indexes(self.weapons, weapon_names)
+        if (len(self.players), len(self.weapons)) != known:
+            self._reserve(np, len(self.players), len(self.weapons))
+            self._save_index()
+        self._add(counters, weapon_names)
+
+    def _flush(self):
+        """Write the arrays and the index to disk and close the arrays."""
+        if self.hits is None:
+            return
+
+        self.hits.flush()
+        self.damage.flush()
+        self._save_index()
+        self.hits = None
+        self.damage = None
+
+    def _open(self, np):
+        """Open the stored arrays, creating them if they do not exist."""
+        HEATMAP_PATH.makedirs_p()
+        try:
+            with (HEATMAP_PATH / "index.json").open() as open_file:
+                index = json.load(open_file)
+        except FileNotFoundError:
+            index = {"players": [], "names": {}, "weapons": []}
+
+        self.players = {
+            uniqueid: row for row, uniqueid in enumerate(index["players"])
+        }
+        self.weapons = {
+            name: column for column, name in enumerate(index["weapons"])
+        }
+        self.names.update(
+            (uniqueid, name) for uniqueid, name in index["names"].items()
+            if uniqueid not in self.names
+        )
+        self.hits = self._load(np, "hits")
+        self.damage = self._load(np, "damage")
+
+    def _reserve(self, np, players, weapons):
+        """Grow the stored arrays if they are too small."""
+        old_players, old_weapons = self.hits.shape[:2]
+        capacity, width = old_players, old_weapons
+        if players <= capacity and weapons <= width:
+            return
+
+        while capacity < players:
+            capacity *= 2
+        while width < weapons:
+            width *= 2
+
+        # Copy into larger files and only then replace the old ones
+        for name in ("hits", "damage"):
+            new = self._create(np, f"{name}.new", capacity, width)
+            new[:old_players, :old_weapons] = getattr(self, name)
+            new.flush()
+            del new
+            setattr(self, name, None)
+            Path(HEATMAP_PATH / f"{name}.new.npy").replace(
+                HEATMAP_PATH / f"{name}.npy",
+            )
+            setattr(self, name, self._load(np, name))
+
+    def _load(self, np, name):
+        """Return the memory-mapped array, creating it if it is missing."""
+        try:
+            return np.load(HEATMAP_PATH / f"{name}.npy", mmap_mode="r+")
+        except FileNotFoundError:
+            return self._create(np, name, INITIAL_PLAYERS, INITIAL_WEAPONS)
+
+    @staticmethod
+    def _create(np, name, players, weapons):
+        """Create a new zeroed array file and return it memory-mapped."""
+        return np.lib.format.open_memmap(
+            HEATMAP_PATH / f"{name}.npy",
+            mode="w+",
+            dtype=np.uint32,
+            shape=(players, weapons, MAX_HITGROUPS),
+        )
+
+    @staticmethod
+    def _get_indexes(indexes, keys):
+        """Return the index of each key, adding any new keys to the end."""
+        return [indexes.setdefault(key, len(indexes)) for key in keys]
+
+    def _save_index(self):
+        """Store the players, their names and the weapons for each index."""
+        temp_path = HEATMAP_PATH / "index.json.new"
+        with temp_path.open("w") as open_file:
+            json.dump(
+                {
+                    "players": list(self.players),
+                    "names": {
+                        uniqueid: self.names.get(uniqueid, "")
+                        for uniqueid in self.players
+                    },
+                    "weapons": list(self.weapons),
+                },
+                open_file,
+            )
+        Path(temp_path).replace(HEATMAP_PATH / "index.json")
+
+
+stats_heatmap = _StatsHeatmap()
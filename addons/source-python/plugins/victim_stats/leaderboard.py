@@ -0,0 +1,170 @@
+# ../victim_stats/leaderboard.py
+
+"""Keeps the round's top players up to date as the stats come in."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python
+from heapq import nlargest
+
+# Source.Python
+from filters.players import PlayerIter
+from players.helpers import get_client_language
+
+# Plugin
+from .config import round_leaderboard_size
+from .output import chat_output
+from .players import player_dictionary
+from .templates import message_templates
+
+# =============================================================================
+# >> ALL DECLARATION
+# =============================================================================
+__all__ = (
+    "TopPlayers",
+    "round_leaderboard",
+)
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class TopPlayers(dict):
+    """
+    Stores a total for each userid along with the top userids.
+
+    Totals only ever increase during a round, so each update only has to
+    move the userid up within the short top list.
+    """
+
+    __slots__ = ("top",)
+
+    def __init__(self):
+        """Create the top list."""
+        super().__init__()
+        self.top = []
+
+    def add(self, userid, value):
+        """Add the value to the userid's total and update the top list."""
+        total = self[userid] = self.get(userid, 0) + value
+        top = self.top
+        size = int(round_leaderboard_size)
+        if userid in top:
+            position = top.index(userid)
+        elif len(top) < size:
+            top.append(userid)
+            position = len(top) - 1
+        elif size and total > self[top[-1]]:
+            position = len(top) - 1
+        else:
+            return
+
+        while position and self[top[position - 1]] < total:
+            top[position] = top[position - 1]
+            position -= 1
+        top[position] = userid
+
+    def iter_top(self):
+        """Yield each top userid and its total from highest to lowest."""
+        for userid in self.top:
+            yield userid, self[userid]
+
+    def remove(self, userid):
+        """Remove the userid and refill the top list from the totals."""
+        if self.pop(userid, None) is None:
+            return
+
+        if userid in self.top:
+            self.top[:] = nlargest(
+                int(round_leaderboard_size),
+                self,
+                key=self.__getitem__,
+            )
+
+    def clear(self):
+        """Remove all totals."""
+        super().clear()
+        self.top.clear()
+
+
+class _RoundLeaderboard:
+    """Stores the top players for damage, kills and headshots."""
+
+    __slots__ = ("damage", "headshots", "kills")
+
+    def __init__(self):
+        """Create the totals for each category."""
+        self.damage = TopPlayers()
+        self.kills = TopPlayers()
+        self.headshots = TopPlayers()
+
+    def __bool__(self):
+        """Return whether anything was recorded this round."""
+        return bool(self.damage or self.kills)
+
+    def iter_categories(self):
+        """Yield each category's name and its totals."""
+        yield "Damage", self.damage
+        yield "Kills", self.kills
+        yield "Headshots", self.headshots
+
+    def iter_totals(self):
+        """Yield each category's totals."""
+        yield self.damage
+        yield self.kills
+        yield self.headshots
+
+    def add_damage(self, userid, damage):
+        """Add the damage the player dealt."""
+        self.damage.add(userid, damage)
+
+    def add_kill(self, userid, *, headshot):
+        """Add a kill for the player."""
+        self.kills.add(userid, 1)
+        if headshot:
+            self.headshots.add(userid, 1)
+
+    def remove(self, userid):
+        """Remove the player from all categories."""
+        for totals in self.iter_totals():
+            totals.remove(userid)
+
+    def clear(self):
+        """Remove all totals for a new round."""
+        for totals in self.iter_totals():
+            totals.clear()
+
+    def iter_messages(self, templates):
+        """Yield the line for each category that has any players."""
+        get_name = player_dictionary.get_name
+        for category, totals in self.iter_categories():
+            if not totals.top:
+                continue
+
+            yield templates.leaderboard[category](
+                players=", ".join(
+                    templates.leaderboard_player(
+                        name=get_name(userid),
+                        value=value,
+                    )
+                    for userid, value in totals.iter_top()
+                ),
+            )
+
+    def send(self):
+        """Send the leaderboard to all human players in their language."""
+        if not (self and int(round_leaderboard_size)):
+            return
+
+        lines = {}
+        for player in PlayerIter(not_filters=["bot"]):
+            language = get_client_language(player.index)
+            if language not in lines:
+                lines[language] = list(
+                    self.iter_messages(message_templates[language, False]),
+                )
+            chat_output.send(player.index, lines[language])
+
+
+round_leaderboard = _RoundLeaderboard()
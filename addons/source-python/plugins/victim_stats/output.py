@@ -0,0 +1,135 @@
+# ../victim_stats/output.py
+
+"""Coalesces chat messages and limits how many are sent each tick."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python
+from collections import deque
+
+# Source.Python
+from core import GAME_NAME
+from engines.server import global_vars
+from listeners import on_tick_listener_manager
+from messages import SayText2
+
+# Plugin
+from .config import chat_messages_per_tick
+
+# =============================================================================
+# >> ALL DECLARATION
+# =============================================================================
+__all__ = (
+    "chat_output",
+)
+
+
+# =============================================================================
+# >> GLOBAL VARIABLES
+# =============================================================================
+# Maximum number of bytes for the text of a single SayText2 message,
+#   leaving room for the rest of the user message within the engine's limit
+MAX_MESSAGE_LENGTH = 240
+
+# CS:GO uses "\n" as a color, so it needs a different separator for lines
+LINE_SEPARATOR = "\u2029" if GAME_NAME == "csgo" else "\n"
+_SEPARATOR_LENGTH = len(LINE_SEPARATOR.encode("utf-8"))
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class _ChatOutput(deque):
+    """Packs each player's lines into as few messages as possible."""
+
+    def __init__(self):
+        """Store the number of messages sent during the current tick."""
+        super().__init__()
+        self._tick_count = -1
+        self._sent = 0
+        self._registered = False
+
+    def send(self, index, lines):
+        """
+        Send the given lines to the player in as few messages as possible.
+
+        Messages over the per-tick budget are queued and sent on the
+        following ticks in the order they were added.
+        """
+        for message in self._pack(lines):
+            if not self and self._has_budget():
+                self._send(index, message)
+                continue
+
+            self.append((index, message))
+            if not self._registered:
+                on_tick_listener_manager.register_listener(self._tick)
+                self._registered = True
+
+    def clear(self):
+        """Remove all queued messages without sending them."""
+        super().clear()
+        if self._registered:
+            on_tick_listener_manager.unregister_listener(self._tick)
+            self._registered = False
+
+    def discard(self, index):
+        """Remove the messages still queued for the player."""
+        queued = [item for item in self if item[0] != index]
+        if len(queued) == len(self):
+            return
+
+        super().clear()
+        self.extend(queued)
+        if not self:
+            self.clear()
+
+    def _has_budget(self):
+        """Return whether another message can be sent during this tick."""
+        tick_count = global_vars.tick_count
+        if tick_count != self._tick_count:
+            self._tick_count = tick_count
+            self._sent = 0
+
+        messages_per_tick = int(chat_messages_per_tick)
+        return not messages_per_tick or self._sent < messages_per_tick
+
+    def _send(self, index, message):
+        """Send the message to the player and count it against the budget."""
+        SayText2(message=message).send(index)
+        self._sent += 1
+
+    def _tick(self):
+        """Send as many queued messages as the budget allows."""
+        while self and self._has_budget():
+            self._send(*self.popleft())
+
+        if not self:
+            self.clear()
+
+    @staticmethod
+    def _pack(lines):
+        """Yield the lines joined into messages that fit the size limit."""
+        message = ""
+        length = 0
+        for line in lines:
+            line_length = len(line.encode("utf-8"))
+            if message and (
+                length + _SEPARATOR_LENGTH + line_length > MAX_MESSAGE_LENGTH
+            ):
+                yield message
+                message = ""
+
+            if message:
+                message += LINE_SEPARATOR + line
+                length += _SEPARATOR_LENGTH + line_length
+            else:
+                message = line
+                length = line_length
+
+        if message:
+            yield message
+
+
+chat_output = _ChatOutput()
@@ -6,25 +6,41 @@
 # >> IMPORTS
 # =============================================================================
 # Python
+from array import array
 from collections import defaultdict
+from sys import getsizeof
+from time import perf_counter_ns
 
 # Source.Python
-from menus import SimpleMenu, SimpleOption
-from messages import SayText2
-from players.entity import Player
-from players.helpers import index_from_userid
+from engines.server import global_vars
+from menus import PagedMenu, PagedOption
+from players.helpers import (
+    get_client_language,
+    index_from_userid,
+    playerinfo_from_userid,
+    uniqueid_from_playerinfo,
+)
 from settings.player import PlayerSettings
 
 # Plugin
-from .colors import ATTACKER_COLOR, KILLED_COLOR, KILLER_COLOR, WOUNDED_COLOR
 from .config import (
     display_type,
     display_type_options,
     distance_type,
     distance_type_options,
+    kill_log_size,
 )
 from .info import info
+from .render import StatsSnapshot, get_distance_display, stats_renderer
+from .shedding import (
+    LEVEL_DEFERRED,
+    LEVEL_FULL,
+    LEVEL_KILLER_ONLY,
+    load_shedder,
+)
 from .strings import CONFIG_STRINGS, TRANSLATION_STRINGS
+from .templates import EMPTY_HITGROUPS, get_hitgroup, message_templates
+from .weapons import WeaponCounters, weapon_ids
 
 # =============================================================================
 # >> GLOBAL VARIABLES
@@ -75,9 +91,30 @@ class _PlayerDictionary(dict):
                 text=CONFIG_STRINGS[item],
             )
 
+        # Invalidate the cached settings when a player changes them
+        for setting in (self.display_type_setting, self.distance_type_setting):
+            self._invalidate_on_select(setting)
+
+        # Store the last known name and uniqueid of each userid
+        self.names = {}
+        self.uniqueids = {}
+
+    @staticmethod
+    def _invalidate_on_select(setting):
+        """Clear the player's cached settings when they select a new value."""
+        select_callback = setting.menu.select_callback
+
+        def _chosen_value(menu, index, option):
+            select_callback(menu, index, option)
+            del settings_cache[index]
+
+        setting.menu.select_callback = _chosen_value
+
     def __missing__(self, userid):
         """Create a PlayerStats instance for missing players."""
-        value = self[userid] = PlayerStats(index_from_userid(userid))
+        value = self[userid] = PlayerStats(userid)
+        self.names[userid] = value.name
+        self.uniqueids[userid] = value.uniqueid
         return value
 
     def __delitem__(self, userid):
@@ -85,39 +122,213 @@ class _PlayerDictionary(dict):
         if userid in self:
             super().__delitem__(userid)
 
+    def clear(self):
+        """Clear all stored players along with their names and uniqueids."""
+        for player in self.values():
+            player.close_interactive_menu()
+        super().clear()
+        self.names.clear()
+        self.uniqueids.clear()
+
+    def remove_opponent(self, userid):
+        """Remove the userid from all players' stats and forget its info."""
+        for player in self.values():
+            player.remove_opponent(userid)
+        self.names.pop(userid, None)
+        self.uniqueids.pop(userid, None)
+
+    def get_name(self, userid):
+        """Return the last known name of the player with the given userid."""
+        return self.names.get(userid, "")
+
+    def set_name(self, userid, name):
+        """Update the cached name of the player with the given userid."""
+        if userid in self:
+            self[userid].name = name
+        if userid in self.names:
+            self.names[userid] = name
+
+    def set_team(self, userid, team):
+        """Update the cached team of the player with the given userid."""
+        if userid in self:
+            self[userid].team = team
+
 
 player_dictionary = _PlayerDictionary()
 
 
-class PlayerStats(Player):
+class _SettingsCache(dict):
+    """Stores each player's display and distance settings by index."""
+
+    def __missing__(self, index):
+        """Resolve and store the player's settings."""
+        value = self[index] = (
+            int(player_dictionary.display_type_setting.get_setting(index)),
+            int(player_dictionary.distance_type_setting.get_setting(index)),
+        )
+        return value
+
+    def __delitem__(self, index):
+        """Remove the player only if they are in the dictionary."""
+        if index in self:
+            super().__delitem__(index)
+
+
+settings_cache = _SettingsCache()
+
+
+class PlayerStats:
     """Store victim stats information and display it when the player dies."""
 
-    def __init__(self, index):
-        """Create the base dictionaries to store victim stats information."""
-        super().__init__(index)
-        self.taken = defaultdict(PlayerDamage)
-        self.given = defaultdict(PlayerDamage)
+    __slots__ = (
+        "index",
+        "interactive_menu",
+        "is_bot",
+        "killed",
+        "name",
+        "taken",
+        "team",
+        "uniqueid",
+        "userid",
+        "victims",
+        "weapons",
+        "wounded",
+    )
+
+    def __init__(self, userid):
+        """Cache the player's information and create the base dictionaries."""
+        playerinfo = playerinfo_from_userid(userid)
+        self.userid = userid
+        self.index = index_from_userid(userid)
+        self.name = playerinfo.name
+        self.team = playerinfo.team
+        self.is_bot = playerinfo.is_fake_client()
+        self.uniqueid = uniqueid_from_playerinfo(playerinfo)
+        self.taken = DamageGroup()
+        self.wounded = DamageGroup()
+        self.victims = DamageGroup()
         self.killed = defaultdict(PlayerKill)
+        self.weapons = WeaponCounters()
+        self.interactive_menu = None
+
+    @property
+    def language(self):
+        """Return the player's language."""
+        return get_client_language(self.index)
+
+    def add_given(self, userid, damage, hitgroup):
+        """Add the damage given to the opponent to the correct group."""
+        group = self.victims if userid in self.victims else self.wounded
+        group.add_hit(userid, damage, hitgroup)
+
+    def add_kill(self, userid):
+        """Move the opponent to the killed group and return their kill info."""
+        if userid in self.wounded:
+            self.victims.add(userid, self.wounded.pop(userid))
+        return self.killed[userid]
+
+    def remove_opponent(self, userid):
+        """Remove all stats stored for the given opponent."""
+        self.taken.discard(userid)
+        self.wounded.discard(userid)
+        self.victims.discard(userid)
+        self.killed.pop(userid, None)
+        if self.interactive_menu is not None:
+            self.interactive_menu.remove_opponent(userid)
+
+    def close_interactive_menu(self):
+        """Close the interactive menu and drop its cached pages."""
+        menu = self.interactive_menu
+        if menu is None:
+            return
+
+        self.interactive_menu = None
+        menu.close(self.index)
+        menu.pages.clear()
+        menu.clear()
+
+    def get_memory_usage(self):
+        """Return the number of stored entries and their approximate size."""
+        entries = len(self.killed)
+        size = getsizeof(self) + getsizeof(self.killed) + sum(
+            getsizeof(values) + getsizeof(values.weapons) +
+            getsizeof(values.headshot_flags) + getsizeof(values.distances)
+            for values in self.killed.values()
+        )
+        for group in (self.taken, self.wounded, self.victims):
+            entries += len(group)
+            size += getsizeof(group) + getsizeof(group.order) + sum(
+                getsizeof(values) + getsizeof(values.hitgroups)
+                for values in group.values()
+            )
+        return entries, size
 
     def send_stats(
         self, kill_type=None, attacker_name=None, headshot=None, weapon=None,
-        distance=None, health=None,
+        distance=None, health=None, *, scheduled=False, death_tick=None,
     ):
         """Send victim stats to the player."""
         # Is the player a bot?
-        if self.is_fake_client():
+        if self.is_bot:
+            return
+
+        # Stats sent later still show the timeline up to the death itself
+        if death_tick is None:
+            death_tick = global_vars.tick_count
+
+        start = perf_counter_ns()
+        try:
+            self._send_stats(
+                level=load_shedder.get_level(scheduled=scheduled),
+                kill_type=kill_type,
+                attacker_name=attacker_name,
+                headshot=headshot,
+                weapon=weapon,
+                distance=distance,
+                health=health,
+                death_tick=death_tick,
+            )
+        finally:
+            load_shedder.add_time(perf_counter_ns() - start)
+
+    def _send_stats(
+        self, level, kill_type, attacker_name, headshot, weapon, distance,
+        health, death_tick,
+    ):
+        """Send victim stats to the player at the given load level."""
+        # Should the stats wait until the end of the round?
+        if level == LEVEL_DEFERRED:
+            load_shedder.defer(
+                self.userid,
+                kill_type=kill_type,
+                attacker_name=attacker_name,
+                headshot=headshot,
+                weapon=weapon,
+                distance=distance,
+                health=health,
+                death_tick=death_tick,
+            )
             return
 
         # Get the player's settings
-        setting = int(
-            player_dictionary.display_type_setting.get_setting(self.index),
-        )
-        distance_setting = int(
-            player_dictionary.distance_type_setting.get_setting(self.index),
-        )
+        setting, distance_setting = settings_cache[self.index]
+
+        # Should only the killer be sent?
+        if level == LEVEL_KILLER_ONLY:
+            if kill_type is not None:
+                self.send_killer(
+                    kill_type=kill_type,
+                    attacker_name=attacker_name,
+                    attacker_headshot=headshot,
+                    weapon=weapon,
+                    distance=distance,
+                    health=health,
+                    distance_setting=distance_setting,
+                )
+            return
 
         # Should hitgroups be included?
-        use_hitgroups = setting in (1, 3)
+        use_hitgroups = setting in (1, 3) and level == LEVEL_FULL
 
         # Should the stats be printed to chat?
         if setting in (1, 2):
@@ -130,6 +341,7 @@ class PlayerStats(Player):
                 health=health,
                 distance_setting=distance_setting,
                 use_hitgroups=use_hitgroups,
+                death_tick=death_tick,
             )
 
         # Should the basic menu be used?
@@ -143,6 +355,7 @@ class PlayerStats(Player):
                 health=health,
                 distance_setting=distance_setting,
                 use_hitgroups=use_hitgroups,
+                death_tick=death_tick,
             )
 
         # Should the interactive menu be used?
@@ -157,241 +370,411 @@ class PlayerStats(Player):
                 distance_setting=distance_setting,
             )
 
-    def get_hitgroups(self, group):
-        """Return a string for the given group's hitgroups."""
-        hitgroups = []
-        for hitgroup, value in group.hitgroups.items():
-            name = TRANSLATION_STRINGS[f"Hitgroup:{hitgroup}"].get_string(
-                language=self.language,
-            )
-            hitgroups.append(f"{name}: {value}")
-        return " - " + "; ".join(hitgroups)
-
-    def get_weapon_info(
-        self, string_name, kill_info, distance_setting, for_menu,
-    ):
-        """Return the translation for weapon info and headshot."""
-        if string_name not in ("Killed", "Killer"):
-            return "", ""
-
-        if kill_info is None:
-            return "", ""
-
-        message = TRANSLATION_STRINGS["Base:Weapon"].get_string(
-            language=self.language,
-            weapon_color="" if for_menu else "\x05",
-            weapon=kill_info.weapon,
-            at_color="" if for_menu else "\x01",
-            distance_color="" if for_menu else "\x04",
-            distance=self.get_distance_display(
-                distance=kill_info.distance,
-                setting=distance_setting,
-            ),
-        )
-        headshot = ""
-        if kill_info.headshot and not for_menu:
-            headshot = TRANSLATION_STRINGS["Headshot"]
-        return message, headshot
-
-    def iter_messages(
-        self, string_name, group, use_hitgroups, distance_setting, color=None,
-    ):
-        """Yield each message to be sent for the given group."""
-        for_menu = color is None
-        for username, values in group.items():
-            hitgroups = self.get_hitgroups(values) if use_hitgroups else ""
-            weapon_info, headshot = self.get_weapon_info(
-                string_name=string_name,
-                kill_info=self.killed.get(username),
-                distance_setting=distance_setting,
-                for_menu=for_menu,
-            )
-            message_type = ""
-            if not for_menu:
-                message_type = TRANSLATION_STRINGS[f"Type:{string_name}"]
-            yield TRANSLATION_STRINGS["Base"].get_string(
-                self.language,
-                type_color=color or "",
-                type=message_type,
-                name_color="" if for_menu else "\x04",
-                name=username,
-                damage_color="" if for_menu else "\x01",
-                damage=group[username].damage,
-                weapon_info=weapon_info,
-                headshot=headshot,
-                hitgroup_info=hitgroups,
-            )
-
-    def get_kill_message(
-        self, kill_type, attacker_name, attacker_headshot, weapon, distance,
-        health, distance_setting, color=None,
-    ):
-        """Return the message to send for the killer's information."""
-        if kill_type is None:
-            return None
-
-        if kill_type in ("Suicide", "Team Killed"):
-            return TRANSLATION_STRINGS[kill_type].get_string(
-                name=attacker_name,
-            )
+    def get_accuracy(self, weapon, templates):
+        """
+        Return the player's accuracy with the given weapon.
 
-        for_menu = color is None
-        weapon_info, headshot = self.get_weapon_info(
-            string_name="Killer",
-            kill_info=PlayerKill(weapon, attacker_headshot, distance),
-            distance_setting=distance_setting,
-            for_menu=for_menu,
-        )
-        message_type = "Killer" if health else "Killer:Dead"
-        return TRANSLATION_STRINGS[message_type].get_string(
-            self.language,
-            type_color="" if for_menu else color,
-            headshot=headshot,
-            name_color="" if for_menu else "\x04",
-            name=attacker_name,
-            weapon_info=weapon_info,
-            health=health,
-        )
+        The accuracy covers every shot fired with the weapon, not only those
+        at one victim. Only the weapon of the last kill on each victim has
+        its accuracy shown, even if earlier kills used other weapons.
+        """
+        shots, hits = self.weapons.get(weapon_ids[weapon])[:2]
+        if not shots:
+            return ""
+        return templates.accuracy(hits=hits, shots=shots)
 
     def send_chat_stats(
         self, kill_type, attacker_name, attacker_headshot, weapon, distance,
         health, distance_setting, use_hitgroups,
+        death_tick,
     ):
         """Send victim stats to the player's chat."""
-        wounded_only = {
-            username: values
-            for username, values in self.given.items()
-            if username not in self.killed
-        }
-        killed_only = {
-            username: values
-            for username, values in self.given.items()
-            if username in self.killed
-        }
-        for string_name, group, color in (
-            ("Attacker", self.taken, ATTACKER_COLOR),
-            ("Wounded", wounded_only, WOUNDED_COLOR),
-            ("Killed", killed_only, KILLED_COLOR),
-        ):
-            for message in self.iter_messages(
-                string_name=string_name,
-                group=group,
-                use_hitgroups=use_hitgroups,
+        stats_renderer.submit(
+            StatsSnapshot(
+                player=self,
+                names=player_dictionary.names,
+                kill=(
+                    kill_type, attacker_name, attacker_headshot, weapon,
+                    distance, health,
+                ),
                 distance_setting=distance_setting,
-                color=color,
-            ):
-                SayText2(message=message).send(self.index)
-
-        kill_message = self.get_kill_message(
-            kill_type=kill_type,
-            attacker_name=attacker_name,
-            attacker_headshot=attacker_headshot,
-            weapon=weapon,
-            distance=distance,
-            health=health,
-            distance_setting=distance_setting,
-            color=KILLER_COLOR,
+                use_hitgroups=use_hitgroups,
+                death_tick=death_tick,
+            ),
         )
-        if kill_message is not None:
-            SayText2(message=kill_message).send(self.index)
 
     def send_menu_stats(
         self, kill_type, attacker_name, attacker_headshot, weapon, distance,
         health, distance_setting, use_hitgroups,
+        death_tick,
     ):
         """Send victim stats to the player via a menu."""
-        wounded_only = {
-            username: values
-            for username, values in self.given.items()
-            if username not in self.killed
-        }
-        killed_only = {
-            username: values
-            for username, values in self.given.items()
-            if username in self.killed
-        }
-        menu = SimpleMenu()
-        for num, (string_name, group) in enumerate(
-            iterable=[
-                ("Attackers", self.taken),
-                ("Wounded", wounded_only),
-                ("Killed", killed_only),
-            ],
-            start=1,
-        ):
-            if not group:
-                continue
-
-            menu.append(
-                SimpleOption(
-                    choice_index=num,
-                    text=TRANSLATION_STRINGS[f"Type:{string_name}"],
-                    selectable=False,
+        stats_renderer.submit(
+            StatsSnapshot(
+                player=self,
+                names=player_dictionary.names,
+                kill=(
+                    kill_type, attacker_name, attacker_headshot, weapon,
+                    distance, health,
                 ),
-            )
-            for message in self.iter_messages(
-                string_name=string_name,
-                group=group,
-                use_hitgroups=use_hitgroups,
                 distance_setting=distance_setting,
-            ):
-                menu.append("  " + message)
-
-        kill_message = self.get_kill_message(
-            kill_type=kill_type,
-            attacker_name=attacker_name,
-            attacker_headshot=attacker_headshot,
-            weapon=weapon,
-            distance=distance,
-            health=health,
-            distance_setting=distance_setting,
+                use_hitgroups=use_hitgroups,
+                for_menu=True,
+                death_tick=death_tick,
+            ),
         )
-        if kill_message:
-            menu.append(
-                SimpleOption(
-                    choice_index=4,
-                    text=TRANSLATION_STRINGS["Type:Killer"],
-                    selectable=False,
-                ),
-            )
-            menu.append("   " + kill_message)
 
-        menu.send(self.index)
+    def send_killer(
+        self, kill_type, attacker_name, attacker_headshot, weapon, distance,
+        health, distance_setting,
+    ):
+        """Send only the killer's information to the player's chat."""
+        stats_renderer.submit(
+            StatsSnapshot(
+                player=self,
+                names=player_dictionary.names,
+                kill=(
+                    kill_type, attacker_name, attacker_headshot, weapon,
+                    distance, health,
+                ),
+                distance_setting=distance_setting,
+                kill_only=True,
+            ),
+        )
 
     def send_interactive_menu(
         self, kill_type, attacker_name, attacker_headshot, weapon, distance,
         health, distance_setting,
     ):
         """Send victim stats to the player via an interactive menu."""
+        if kill_type is not None:
+            self.send_killer(
+                kill_type=kill_type,
+                attacker_name=attacker_name,
+                attacker_headshot=attacker_headshot,
+                weapon=weapon,
+                distance=distance,
+                health=health,
+                distance_setting=distance_setting,
+            )
 
-    @staticmethod
-    def get_distance_display(distance, setting):
-        """Return the formatted distance between players."""
-        feet = distance * 0.0375
-        if setting == 1:
-            return f"{feet:.2f}ft"
-        meters = feet * 0.3408
-        if setting == 0:
-            return f"{meters:.2f}m"
-        return f"{meters:.2f}m ({feet:.2f}ft)"
+        if not (self.taken or self.wounded or self.victims):
+            return
+
+        # The pages are only built once the player opens them
+        self.interactive_menu = InteractiveMenu(self, distance_setting)
+        self.interactive_menu.send(self.index)
+
+
+class InteractiveMenu(PagedMenu):
+    """Overview of the player's opponents that drills down into each one."""
+
+    def __init__(self, player, distance_setting):
+        """Store the player and the cache for the opponent pages."""
+        super().__init__(
+            title=TRANSLATION_STRINGS["Menu:Title"],
+            build_callback=self._build_overview,
+            select_callback=self._select_opponent,
+        )
+        self.player = player
+        self.distance_setting = distance_setting
+        self.pages = {}
+
+    def _build_overview(self, menu, index):  # noqa: ARG002
+        """Add an option for each opponent the first time it is sent."""
+        if self:
+            return
+
+        player = self.player
+        templates = message_templates[player.language, True]
+        for string_name, group in (
+            ("Attacker", player.taken),
+            ("Wounded", player.wounded),
+            ("Killed", player.victims),
+        ):
+            for userid, values in group.items():
+                self.append(
+                    PagedOption(
+                        text=TRANSLATION_STRINGS["Menu:Opponent"].get_string(
+                            player.language,
+                            type=templates.types[string_name],
+                            name=player_dictionary.get_name(userid),
+                            damage=values.damage,
+                        ),
+                        value=(string_name, userid),
+                    ),
+                )
+
+    def remove_opponent(self, userid):
+        """Remove the option and cached page for the given opponent."""
+        self[:] = [option for option in self if option.value[1] != userid]
+        for key in [key for key in self.pages if key[1] == userid]:
+            del self.pages[key]
+
+    def _select_opponent(self, menu, index, option):  # noqa: ARG002
+        """Return the cached page for the opponent, building it if needed."""
+        page = self.pages.get(option.value)
+        if page is None:
+            page = self.pages[option.value] = self._build_page(*option.value)
+        return page
+
+    def _build_page(self, string_name, userid):
+        """Return the page with the detailed stats for the opponent."""
+        player = self.player
+        language = player.language
+        templates = message_templates[language, True]
+        if string_name == "Attacker":
+            values = player.taken[userid]
+
+        # Was the opponent killed since the overview was built?
+        elif userid in player.victims:
+            string_name = "Killed"
+            values = player.victims[userid]
+        else:
+            values = player.wounded[userid]
+
+        page = PagedMenu(
+            title=TRANSLATION_STRINGS["Menu:Opponent"].get_string(
+                language,
+                type=templates.types[string_name],
+                name=player_dictionary.get_name(userid),
+                damage=values.damage,
+            ),
+            parent_menu=self,
+        )
+        page.append(
+            TRANSLATION_STRINGS["Menu:Hits"].get_string(
+                language,
+                hits=values.hits,
+            ),
+        )
+        for hitgroup, value in enumerate(values.hitgroups):
+            if value:
+                page.append(f"  {templates.hitgroups[hitgroup]}: {value}")
+
+        kill_info = player.killed.get(userid)
+        if string_name == "Killed" and kill_info is not None:
+            if kill_info.kills > 1:
+                self._add_kill_log(page, kill_info, language)
+            else:
+                self._add_kill(page, kill_info, language)
+
+            accuracy = player.get_accuracy(kill_info.weapon, templates)
+            if accuracy:
+                page.append(accuracy.strip())
+
+        return page
+
+    def _add_kill(self, page, kill_info, language):
+        """Add the weapon, distance and headshot of the only kill."""
+        page.append(
+            TRANSLATION_STRINGS["Menu:Weapon"].get_string(
+                language,
+                weapon=kill_info.weapon,
+            ),
+        )
+        page.append(
+            TRANSLATION_STRINGS["Menu:Distance"].get_string(
+                language,
+                distance=get_distance_display(
+                    distance=kill_info.distance,
+                    setting=self.distance_setting,
+                ),
+            ),
+        )
+        if kill_info.headshot:
+            page.append(TRANSLATION_STRINGS["Menu:Headshot"])
+
+    def _add_kill_log(self, page, kill_info, language):
+        """Add the totals and each logged kill of the opponent."""
+        page.append(
+            TRANSLATION_STRINGS["Menu:Kills"].get_string(
+                language,
+                kills=kill_info.kills,
+                headshots=kill_info.headshots,
+            ),
+        )
+        page.append(
+            TRANSLATION_STRINGS["Menu:Longest"].get_string(
+                language,
+                distance=get_distance_display(
+                    distance=kill_info.longest,
+                    setting=self.distance_setting,
+                ),
+            ),
+        )
+        headshot = TRANSLATION_STRINGS["Headshot"].get_string(language)
+        for weapon, is_headshot, distance in kill_info:
+            page.append(
+                TRANSLATION_STRINGS["Menu:Kill"].get_string(
+                    language,
+                    weapon=weapon,
+                    distance=get_distance_display(
+                        distance=distance,
+                        setting=self.distance_setting,
+                    ),
+                    headshot=headshot if is_headshot else "",
+                ),
+            )
+
+
+class DamageGroup(dict):
+    """Stores damage by userid, ordered from the most damage to the least."""
+
+    __slots__ = ("order",)
+
+    def __init__(self):
+        """Create the list used to order the userids."""
+        super().__init__()
+        self.order = []
+
+    def __iter__(self):
+        """Iterate over the userids from the most damage to the least."""
+        return iter(self.order)
+
+    def items(self):
+        """Yield each userid and its damage from the most to the least."""
+        for userid in self.order:
+            yield userid, self[userid]
+
+    def add(self, userid, value):
+        """Add the existing damage for the userid in its ordered place."""
+        self[userid] = value
+        self.order.append(userid)
+        self._move_up(userid, value.damage)
+
+    def add_hit(self, userid, damage, hitgroup):
+        """Add a single hit for the userid and keep the group ordered."""
+        value = self.get(userid)
+        if value is None:
+            value = self[userid] = PlayerDamage()
+            self.order.append(userid)
+        value.add_hit(damage, hitgroup)
+        self._move_up(userid, value.damage)
+
+    def pop(self, userid):
+        """Remove and return the damage for the userid."""
+        self.order.remove(userid)
+        return super().pop(userid)
+
+    def discard(self, userid):
+        """Remove the userid if it is in the group."""
+        if userid in self:
+            self.pop(userid)
+
+    def clear(self):
+        """Remove all userids from the group."""
+        super().clear()
+        self.order.clear()
+
+    def _move_up(self, userid, damage):
+        """Move the userid ahead of all userids with less damage."""
+        order = self.order
+        position = order.index(userid)
+        while position and self[order[position - 1]].damage < damage:
+            order[position] = order[position - 1]
+            position -= 1
+        order[position] = userid
 
 
 class PlayerDamage:
     """Class used to store basic damage information."""
 
+    __slots__ = ("damage", "hitgroups", "hits")
+
     def __init__(self):
         """Store the base damage information."""
         self.damage = 0
         self.hits = 0
-        self.hitgroups = defaultdict(int)
+        self.hitgroups = EMPTY_HITGROUPS[:]
+
+    def add_hit(self, damage, hitgroup):
+        """Add the damage and hitgroup for a single hit."""
+        self.damage += damage
+        self.hits += 1
+        self.hitgroups[get_hitgroup(hitgroup)] += 1
 
 
 class PlayerKill:
-    """Class used to store basic kill information."""
+    """
+    Stores the totals and a log of the kills against one opponent.
+
+    The weapon id, headshot flag and distance of the most recent kills
+    are kept in small arrays. Once the log is full, each kill replaces
+    the oldest one, while the totals keep counting every kill.
+    """
+
+    __slots__ = (
+        "distances",
+        "headshot_flags",
+        "headshots",
+        "kills",
+        "last",
+        "longest",
+        "weapons",
+    )
 
-    def __init__(self, weapon=None, headshot=False, distance=0):
-        """Store the base kill information."""
+    def __init__(self):
+        """Store the base totals and create the empty log."""
         self.kills = 0
-        self.weapon = weapon
-        self.headshot = headshot
-        self.distance = distance
+        self.headshots = 0
+        self.longest = 0.0
+        self.weapons = array("H")
+        self.headshot_flags = array("B")
+        self.distances = array("f")
+        self.last = -1
+
+    def __iter__(self):
+        """
+        Yield the weapon, headshot and distance of each logged kill.
+
+        The kills are yielded from the oldest to the most recent.
+        """
+        count = len(self.weapons)
+        start = (self.last + 1) % count if count else 0
+        names = weapon_ids.names
+        for offset in range(count):
+            index = (start + offset) % count
+            yield (
+                names[self.weapons[index]],
+                bool(self.headshot_flags[index]),
+                self.distances[index],
+            )
+
+    @property
+    def weapon(self):
+        """Return the name of the weapon of the most recent kill."""
+        if self.last < 0:
+            return None
+        return weapon_ids.names[self.weapons[self.last]]
+
+    @property
+    def headshot(self):
+        """Return whether the most recent kill was a headshot."""
+        return self.last >= 0 and bool(self.headshot_flags[self.last])
+
+    @property
+    def distance(self):
+        """Return the distance of the most recent kill."""
+        if self.last < 0:
+            return 0.0
+        return self.distances[self.last]
+
+    def add(self, weapon, distance, *, headshot):
+        """Add the kill to the totals and the log."""
+        self.kills += 1
+        self.headshots += headshot
+        self.longest = max(self.longest, distance)
+
+        # Fill the log up to its size, then overwrite the oldest kill
+        if len(self.weapons) < max(int(kill_log_size), 1):
+            self.weapons.append(weapon)
+            self.headshot_flags.append(headshot)
+            self.distances.append(distance)
+            self.last = len(self.weapons) - 1
+            return
+
+        self.last = (self.last + 1) % len(self.weapons)
+        self.weapons[self.last] = weapon
+        self.headshot_flags[self.last] = headshot
+        self.distances[self.last] = distance
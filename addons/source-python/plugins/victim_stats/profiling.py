@@ -0,0 +1,173 @@
+# ../victim_stats/profiling.py
+
+"""Optional timings for the event handlers and stats renderers."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python
+from array import array
+from functools import wraps
+from time import perf_counter_ns
+
+# Source.Python
+from events.manager import event_manager
+
+# =============================================================================
+# >> ALL DECLARATION
+# =============================================================================
+__all__ = (
+    "profiler",
+)
+
+
+# =============================================================================
+# >> GLOBAL VARIABLES
+# =============================================================================
+# Histogram buckets are powers of 2 microseconds, with the last catching all
+HISTOGRAM_BUCKETS = 16
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class HandlerTimings:
+    """Stores the call count and timings for a single handler."""
+
+    __slots__ = ("calls", "histogram", "maximum", "total")
+
+    def __init__(self):
+        """Store the base timings."""
+        self.calls = 0
+        self.total = 0
+        self.maximum = 0
+        self.histogram = array("L", [0]) * HISTOGRAM_BUCKETS
+
+    def add(self, elapsed):
+        """Add the time in nanoseconds for a single call."""
+        self.calls += 1
+        self.total += elapsed
+        self.maximum = max(self.maximum, elapsed)
+        bucket = (elapsed // 1000).bit_length()
+        self.histogram[min(bucket, HISTOGRAM_BUCKETS - 1)] += 1
+
+
+class _Profiler(dict):
+    """
+    Stores the timings for each handler by name.
+
+    While disabled, the original functions stay registered and no timing
+    code runs at all. Enabling swaps each of them for a timed wrapper.
+    """
+
+    def __init__(self):
+        """Create the storage for the handlers to profile."""
+        super().__init__()
+        self.enabled = False
+        self._events = []
+        self._methods = []
+        self._wrappers = {}
+
+    def event(self, event_name):
+        """Register the decorated event handler to be profiled."""
+        def decorator(callback):
+            self._events.append((event_name, callback))
+            return callback
+        return decorator
+
+    def method(self, cls, *method_names):
+        """Register the methods of the given class to be profiled."""
+        for method_name in method_names:
+            self._methods.append((cls, method_name, getattr(cls, method_name)))
+
+    def enable(self):
+        """Replace each registered handler with its timed wrapper."""
+        if self.enabled:
+            return
+
+        for event_name, callback in self._events:
+            wrapper = self._wrappers[event_name, callback] = self._wrap(
+                f"event:{event_name}",
+                callback,
+            )
+            event_manager.unregister_for_event(event_name, callback)
+            event_manager.register_for_event(event_name, wrapper)
+
+        for cls, method_name, method in self._methods:
+            setattr(
+                cls,
+                method_name,
+                self._wrap(f"{cls.__name__}.{method_name}", method),
+            )
+
+        self.enabled = True
+
+    def disable(self):
+        """Restore the original handlers."""
+        if not self.enabled:
+            return
+
+        for event_name, callback in self._events:
+            event_manager.unregister_for_event(
+                event_name,
+                self._wrappers.pop((event_name, callback)),
+            )
+            event_manager.register_for_event(event_name, callback)
+
+        for cls, method_name, method in self._methods:
+            setattr(cls, method_name, method)
+
+        self.enabled = False
+
+    def reset(self):
+        """Reset all stored timings."""
+        for timings in self.values():
+            timings.__init__()
+
+    def iter_report(self):
+        """Yield the lines of the report for all stored timings."""
+        yield (
+            f"{'handler':<32}{'calls':>9}{'total ms':>11}{'avg us':>9}"
+            f"{'max us':>10}"
+        )
+        for name, timings in sorted(self.items()):
+            if not timings.calls:
+                continue
+
+            yield (
+                f"{name:<32}{timings.calls:>9}{timings.total / 1e6:>11.2f}"
+                f"{timings.total / timings.calls / 1000:>9.1f}"
+                f"{timings.maximum / 1000:>10.1f}"
+            )
+            yield "    " + " ".join(
+                f"{_get_bucket_label(bucket)}:{count}"
+                for bucket, count in enumerate(timings.histogram)
+                if count
+            )
+
+    def _wrap(self, name, function):
+        """Return a wrapper that times each call to the given function."""
+        timings = self.setdefault(name, HandlerTimings())
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timings.add(perf_counter_ns() - start)
+
+        return wrapper
+
+
+profiler = _Profiler()
+
+
+# =============================================================================
+# >> HELPER FUNCTIONS
+# =============================================================================
+def _get_bucket_label(bucket):
+    """Return the label for the given histogram bucket."""
+    if bucket == HISTOGRAM_BUCKETS - 1:
+        return f">={2 ** (bucket - 1)}us"
+    return f"<{2 ** bucket}us"
@@ -0,0 +1,313 @@
+# ../victim_stats/recorder.py
+
+"""Records the game events the plugin handles to a binary event log."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python
+from queue import Empty, Queue
+from time import time
+
+# Source.Python
+from engines.server import global_vars
+from events.manager import event_manager
+from listeners.tick import GameThread
+from paths import PLUGIN_DATA_PATH
+from players.entity import Player
+from players.helpers import index_from_userid
+
+# Plugin
+from .event_log import (
+    EVENT_CODES,
+    FLAG_BOT,
+    FLAG_HEADSHOT,
+    HEADER,
+    MAGIC,
+    NAME_RECORD,
+    RECORD,
+    RECORD_SIZE,
+    VERSION,
+    WEAPON_NAME,
+)
+from .info import info
+from .weapons import weapon_ids
+
+# =============================================================================
+# >> ALL DECLARATION
+# =============================================================================
+__all__ = (
+    "RECORDINGS_PATH",
+    "event_recorder",
+)
+
+
+# =============================================================================
+# >> GLOBAL VARIABLES
+# =============================================================================
+RECORDINGS_PATH = PLUGIN_DATA_PATH / info.name / "recordings"
+
+# Number of records each buffer holds and the number of buffers
+RECORDS_PER_BUFFER = 4096
+BUFFER_COUNT = 4
+
+# Queued to tell the writer to stop once everything before it is written
+_STOP = object()
+
+# Zeroed origins for the events that do not record them
+_NO_ORIGINS = (0.0,) * 6
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class _EventLogWriter(GameThread):
+    """Appends the full buffers to the log and hands them back."""
+
+    def __init__(self, path, header, full, free):
+        """Store the path, header and the queues to use."""
+        super().__init__(name=f"{info.name}.recorder", daemon=True)
+        self.path = path
+        self.header = header
+        self.full = full
+        self.free = free
+
+    def run(self):
+        """Write the full buffers until told to stop."""
+        self.path.parent.makedirs_p()
+        with self.path.open("wb") as open_file:
+            open_file.write(self.header)
+            while (item := self.full.get()) is not _STOP:
+                buffer, length = item
+                open_file.write(memoryview(buffer)[:length])
+                self.free.put(buffer)
+
+
+class _EventRecorder:
+    """
+    Packs each event into a preallocated buffer on the game thread.
+
+    Full buffers are written by a background thread. If it falls behind
+    and no empty buffer is left, events are dropped instead of blocking.
+    """
+
+    def __init__(self):
+        """Store the base values."""
+        self.buffer = None
+        self.position = 0
+        self.full = Queue()
+        self.free = Queue()
+        self.writer = None
+        self.path = None
+        self.weapons = 0
+        self.records = 0
+        self.dropped = 0
+        self._callbacks = {
+            event_name: getattr(self, f"_{event_name}")
+            for event_name in EVENT_CODES
+        }
+
+    @property
+    def recording(self):
+        """Return whether events are being recorded."""
+        return self.writer is not None
+
+    def start(self):
+        """Start recording to a new log for the current map."""
+        if self.recording:
+            return
+
+        # Use new queues in case a previous writer was left running
+        self.full = Queue()
+        self.free = Queue()
+        buffers = [
+            bytearray(RECORD_SIZE * RECORDS_PER_BUFFER)
+            for _ in range(BUFFER_COUNT)
+        ]
+        self.buffer = buffers.pop()
+        for buffer in buffers:
+            self.free.put(buffer)
+        self.position = 0
+        self.weapons = 0
+        map_name = global_vars.map_name
+        self.path = RECORDINGS_PATH / f"{map_name}_{time():.0f}.vsr"
+        self.writer = _EventLogWriter(
+            path=self.path,
+            header=HEADER.pack(
+                MAGIC, VERSION, RECORD_SIZE, global_vars.interval_per_tick,
+                map_name.encode()[:64],
+            ),
+            full=self.full,
+            free=self.free,
+        )
+        self.writer.start()
+        for event_name, callback in self._callbacks.items():
+            event_manager.register_for_event(event_name, callback)
+
+    def stop(self, timeout=5):
+        """Stop recording and wait for everything to be written."""
+        if not self.recording:
+            return
+
+        for event_name, callback in self._callbacks.items():
+            event_manager.unregister_for_event(event_name, callback)
+        self.flush()
+        self.full.put(_STOP)
+
+        # Leave a writer that is too far behind to finish on its own
+        self.writer.join(timeout)
+        self.writer = None
+        self.buffer = None
+
+    def restart(self):
+        """Continue recording in a new log if currently recording."""
+        if self.recording:
+            self.stop()
+            self.start()
+
+    def flush(self):
+        """Hand the current buffer to the writer, even if not full."""
+        if self.buffer is None or not self.position:
+            return
+
+        self.full.put((self.buffer, self.position))
+        self.position = 0
+        try:
+            self.buffer = self.free.get_nowait()
+        except Empty:
+            self.buffer = None
+
+    def _record(
+        self, event_name, userid=0, other=0, flags=0, damage=0, health=0,
+        hitgroup=0, extra=0, weapon=0, origins=_NO_ORIGINS,
+    ):
+        """Pack the values as the next record in the buffer."""
+        if self.buffer is None:
+            try:
+                self.buffer = self.free.get_nowait()
+            except Empty:
+                self.dropped += 1
+                return
+
+        # Clamp the damage and health to fit their unsigned short fields
+        RECORD.pack_into(
+            self.buffer, self.position, global_vars.tick_count,
+            EVENT_CODES[event_name], flags, userid, other,
+            min(damage, 0xFFFF), max(0, min(health, 0xFFFF)), hitgroup,
+            extra, weapon, *origins,
+        )
+        self.records += 1
+        self.position += RECORD_SIZE
+        if self.position == len(self.buffer):
+            self.flush()
+
+    def _get_weapon(self, name):
+        """Return the weapon's id, recording its name if it is new."""
+        weapon = weapon_ids[name]
+        while self.weapons <= weapon:
+            if self.buffer is None:
+                try:
+                    self.buffer = self.free.get_nowait()
+                except Empty:
+                    return weapon
+
+            NAME_RECORD.pack_into(
+                self.buffer, self.position, global_vars.tick_count,
+                WEAPON_NAME, 0, self.weapons,
+                weapon_ids.names[self.weapons].encode(),
+            )
+            self.weapons += 1
+            self.position += RECORD_SIZE
+            if self.position == len(self.buffer):
+                self.flush()
+        return weapon
+
+    def _player_connect(self, game_event):
+        """Record the player's userid, index and whether they are a bot."""
+        self._record(
+            "player_connect",
+            userid=game_event["userid"],
+            other=game_event["index"],
+            flags=FLAG_BOT if game_event["networkid"] == "BOT" else 0,
+        )
+
+    def _player_disconnect(self, game_event):
+        """Record the player's userid."""
+        self._record("player_disconnect", userid=game_event["userid"])
+
+    def _player_team(self, game_event):
+        """Record the player's userid and new team."""
+        self._record(
+            "player_team",
+            userid=game_event["userid"],
+            extra=game_event["team"],
+        )
+
+    def _player_spawn(self, game_event):
+        """Record the player's userid."""
+        self._record("player_spawn", userid=game_event["userid"])
+
+    def _weapon_fire(self, game_event):
+        """Record the player's userid and weapon."""
+        self._record(
+            "weapon_fire",
+            userid=game_event["userid"],
+            weapon=self._get_weapon(game_event["weapon"]),
+        )
+
+    def _player_hurt(self, game_event):
+        """Record the attack."""
+        self._record(
+            "player_hurt",
+            userid=game_event["userid"],
+            other=game_event["attacker"],
+            damage=game_event["dmg_health"],
+            health=game_event["health"],
+            hitgroup=game_event["hitgroup"],
+            weapon=self._get_weapon(game_event["weapon"]),
+        )
+
+    def _player_death(self, game_event):
+        """Record the kill along with where both players were."""
+        userid = game_event["userid"]
+        attacker = game_event["attacker"]
+        origins = _get_origin(userid)
+        origins += (
+            origins if attacker in (0, userid) else _get_origin(attacker)
+        )
+        self._record(
+            "player_death",
+            userid=userid,
+            other=attacker,
+            flags=FLAG_HEADSHOT if game_event["headshot"] else 0,
+            weapon=self._get_weapon(game_event["weapon"]),
+            origins=origins,
+        )
+
+    def _round_start(self, game_event):
+        """Record the start of the round."""
+        self._record("round_start")
+
+    def _round_end(self, game_event):
+        """Record the winner and reason and write the round to the log."""
+        self._record(
+            "round_end",
+            other=game_event["winner"],
+            extra=game_event["reason"],
+        )
+        self.flush()
+
+
+event_recorder = _EventRecorder()
+
+
+# =============================================================================
+# >> HELPER FUNCTIONS
+# =============================================================================
+def _get_origin(userid):
+    """Return the player's origin, or zeroes if they are not connected."""
+    try:
+        origin = Player(index_from_userid(userid)).origin
+    except ValueError:
+        return 0.0, 0.0, 0.0
+    return origin.x, origin.y, origin.z
@@ -0,0 +1,466 @@
+# ../victim_stats/render.py
+
+"""Renders victim stats from snapshots, off the game thread if possible."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python
+import sys
+from collections import deque
+from queue import Empty, Full, Queue
+from time import time
+
+# Source.Python
+from engines.server import global_vars
+from listeners import on_tick_listener_manager
+from listeners.tick import GameThread
+from menus import SimpleMenu, SimpleOption
+from players.helpers import index_from_userid
+
+# Plugin
+from .config import render_workers
+from .info import info
+from .output import chat_output
+from .strings import TRANSLATION_STRINGS
+from .templates import get_hitgroup, message_templates
+from .timeline import hit_timelines
+from .weapons import weapon_ids
+
+# =============================================================================
+# >> ALL DECLARATION
+# =============================================================================
+__all__ = (
+    "StatsSnapshot",
+    "get_distance_display",
+    "stats_renderer",
+)
+
+
+# =============================================================================
+# >> GLOBAL VARIABLES
+# =============================================================================
+# Number of snapshots each worker can have waiting before rendering inline
+JOBS_PER_WORKER = 8
+
+# Menu section of each group, along with the translation for its title
+_GROUPS = (
+    (1, "Attackers", "Attacker"),
+    (2, "Wounded", "Wounded"),
+    (3, "Killed", "Killed"),
+)
+
+# Queued to tell a worker to stop
+_STOP = object()
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class StatsSnapshot:
+    """
+    Immutable copy of everything needed to render a player's stats.
+
+    The snapshot is taken on the game thread and only holds tuples of
+    plain values and the already built templates, so it can be rendered
+    on any thread while the live stats keep changing.
+    """
+
+    __slots__ = (
+        "distance_setting",
+        "for_menu",
+        "groups",
+        "index",
+        "kill",
+        "templates",
+        "timeline",
+        "userid",
+    )
+
+    def __init__(
+        self, player, names, kill, distance_setting, *, use_hitgroups=False,
+        for_menu=False, kill_only=False, death_tick=None,
+    ):
+        """Copy the player's stats and the killer's information."""
+        self.userid = player.userid
+        self.index = player.index
+        self.kill = kill
+        self.distance_setting = distance_setting
+        self.for_menu = for_menu
+        self.templates = message_templates[player.language, for_menu]
+        if kill_only:
+            self.groups = ()
+            self.timeline = ()
+            return
+
+        self.groups = tuple(
+            (
+                section,
+                title,
+                string_name,
+                tuple(
+                    (
+                        names.get(userid, ""),
+                        values.damage,
+                        tuple(values.hitgroups) if use_hitgroups else None,
+                        _get_kill_info(player, userid)
+                        if string_name == "Killed" else None,
+                    )
+                    for userid, values in group.items()
+                ),
+            )
+            for (section, title, string_name), group in zip(
+                _GROUPS,
+                (player.taken, player.wounded, player.victims),
+                strict=True,
+            )
+        )
+
+        # Timelines are only shown along with the killer's information
+        timeline = hit_timelines.get(player.userid)
+        if not timeline or kill[0] is None:
+            self.timeline = ()
+            return
+
+        # Stats sent after the death are timed from the tick of the death
+        interval = global_vars.interval_per_tick
+        if death_tick is None:
+            death_tick = global_vars.tick_count
+        self.timeline = tuple(
+            (
+                (death_tick - tick) * interval,
+                names.get(attacker, ""),
+                weapon_ids.names[weapon],
+                get_hitgroup(hitgroup),
+                damage,
+                health,
+            )
+            for tick, attacker, weapon, hitgroup, damage, health in timeline
+        )
+
+    def get_hitgroups(self, hitgroups):
+        """Return a string for the given hitgroup counts."""
+        names = self.templates.hitgroups
+        return " - " + "; ".join(
+            f"{names[hitgroup]}: {value}"
+            for hitgroup, value in enumerate(hitgroups)
+            if value
+        )
+
+    def get_weapon_info(self, kill_info):
+        """Return the translation for weapon info and headshot."""
+        if kill_info is None:
+            return "", ""
+
+        templates = self.templates
+        weapon, distance, headshot, accuracy, totals = kill_info
+        message = templates.weapon(
+            weapon=weapon,
+            distance=get_distance_display(distance, self.distance_setting),
+        )
+
+        # Add the player's accuracy with the weapon they killed with
+        if accuracy is not None:
+            hits, shots = accuracy
+            message += templates.accuracy(hits=hits, shots=shots)
+
+        # Add the totals if the opponent was killed more than once
+        if totals is not None:
+            kills, headshots, longest = totals
+            message += templates.kill_log(
+                kills=kills,
+                headshots=headshots,
+                distance=get_distance_display(
+                    longest,
+                    self.distance_setting,
+                ),
+            )
+
+        return message, templates.headshot if headshot else ""
+
+    def iter_messages(self, string_name, entries):
+        """Yield each message to be sent for the given group's entries."""
+        base = self.templates.base[string_name]
+        for name, damage, hitgroups, kill_info in entries:
+            weapon_info, headshot = self.get_weapon_info(kill_info)
+            yield base(
+                name=name,
+                damage=damage,
+                weapon_info=weapon_info,
+                headshot=headshot,
+                hitgroup_info=(
+                    "" if hitgroups is None else self.get_hitgroups(hitgroups)
+                ),
+            )
+
+    def get_kill_message(self):
+        """Return the message to send for the killer's information."""
+        kill_type, attacker_name, headshot, weapon, distance, health = (
+            self.kill
+        )
+        if kill_type is None:
+            return None
+
+        templates = self.templates
+        if kill_type == "Suicide":
+            return templates.suicide(name=attacker_name)
+
+        if kill_type == "Team Killed":
+            return templates.team_killed(name=attacker_name)
+
+        weapon_info, headshot = self.get_weapon_info(
+            (weapon, distance, headshot, None, None),
+        )
+        message = templates.killer if health else templates.killer_dead
+        return message(
+            headshot=headshot,
+            name=attacker_name,
+            weapon_info=weapon_info,
+            health=health,
+        )
+
+    def iter_timeline_messages(self):
+        """Yield a message for each of the hits leading up to the death."""
+        templates = self.templates
+        hitgroups = templates.hitgroups
+        for seconds, name, weapon, hitgroup, damage, health in self.timeline:
+            yield templates.timeline(
+                seconds=seconds,
+                name=name,
+                weapon=weapon,
+                hitgroup=hitgroups[hitgroup],
+                damage=damage,
+                health=health,
+            )
+
+    def render(self):
+        """Return the chat lines or menu sections for the stats."""
+        if self.for_menu:
+            return self.render_menu()
+        return self.render_chat()
+
+    def render_chat(self):
+        """Return the lines to send to the player's chat."""
+        lines = []
+        for group in self.groups:
+            lines.extend(self.iter_messages(*group[2:]))
+
+        kill_message = self.get_kill_message()
+        if kill_message is not None:
+            if self.kill[0] not in ("Suicide", "Team Killed"):
+                lines.extend(self.iter_timeline_messages())
+            lines.append(kill_message)
+        return lines
+
+    def render_menu(self):
+        """Return each menu section's number, title and lines."""
+        sections = [
+            (
+                section,
+                title,
+                [
+                    "  " + message
+                    for message in self.iter_messages(string_name, entries)
+                ],
+            )
+            for section, title, string_name, entries in self.groups
+            if entries
+        ]
+
+        kill_message = self.get_kill_message()
+        if kill_message:
+            sections.append((4, "Killer", ["   " + kill_message]))
+
+        timeline = [
+            "   " + message for message in self.iter_timeline_messages()
+        ]
+        if timeline:
+            sections.append((5, "Timeline", timeline))
+        return sections
+
+
+class _RenderWorker(GameThread):
+    """Renders the queued snapshots and hands back the results."""
+
+    def __init__(self, number, jobs, done):
+        """Store the queues to take from and add to."""
+        super().__init__(name=f"{info.name}.render.{number}", daemon=True)
+        self.jobs = jobs
+        self.done = done
+
+    def run(self):
+        """Render each snapshot until told to stop."""
+        while (job := self.jobs.get()) is not _STOP:
+            generation, snapshot = job
+            try:
+                result = snapshot.render()
+            # Any error is reported and must not stop the worker
+            except Exception:  # noqa: BLE001
+                sys.excepthook(*sys.exc_info())
+                result = None
+            self.done.append((generation, snapshot, result))
+
+
+class _StatsRenderer:
+    """
+    Renders snapshots on a pool of workers and sends them on a tick.
+
+    When no workers are configured, or every worker already has a full
+    queue, the snapshot is rendered and sent inline instead.
+    """
+
+    def __init__(self):
+        """Store the base values."""
+        self.jobs = None
+        self.done = deque()
+        self.workers = []
+        self.pending = 0
+        self.generation = 0
+        self.inline = 0
+        self.offloaded = 0
+        self._registered = False
+
+    def start(self):
+        """Start the configured number of workers."""
+        count = int(render_workers)
+        if not count or self.workers:
+            return
+
+        self.jobs = Queue(maxsize=count * JOBS_PER_WORKER)
+        self.workers = [
+            _RenderWorker(number, self.jobs, self.done)
+            for number in range(count)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def stop(self, timeout=5):
+        """Stop the workers and drop anything not yet sent."""
+        if self.workers:
+            # Drop the waiting snapshots to make room to stop every worker
+            jobs = self.jobs
+            while not jobs.empty():
+                try:
+                    jobs.get_nowait()
+                except Empty:
+                    break
+            for stop in [_STOP] * len(self.workers):
+                jobs.put_nowait(stop)
+
+            # Leave any worker still rendering after the timeout
+            end_time = time() + timeout
+            for worker in self.workers:
+                worker.join(max(0, end_time - time()))
+        self.workers = []
+        self.jobs = None
+        self.clear()
+        self.pending = 0
+        self._unregister()
+
+    def submit(self, snapshot):
+        """Render the snapshot on a worker, or inline if they are busy."""
+        if self.workers:
+            try:
+                self.jobs.put_nowait((self.generation, snapshot))
+            except Full:
+                pass
+            else:
+                self.offloaded += 1
+                self.pending += 1
+                if not self._registered:
+                    on_tick_listener_manager.register_listener(self._tick)
+                    self._registered = True
+                return
+
+        self.inline += 1
+        self._deliver(snapshot, snapshot.render())
+
+    def clear(self):
+        """Drop all rendered stats and any still being rendered."""
+        self.generation += 1
+
+        # Count each dropped result as handled so the listener unregisters
+        done = self.done
+        while done:
+            done.popleft()
+            self.pending -= 1
+
+    def _tick(self):
+        """Send everything rendered since the last tick."""
+        done = self.done
+        while done:
+            generation, snapshot, result = done.popleft()
+            self.pending -= 1
+            if generation != self.generation or result is None:
+                continue
+
+            # Was the player replaced since the snapshot was taken?
+            try:
+                index = index_from_userid(snapshot.userid)
+            except ValueError:
+                continue
+            if index == snapshot.index:
+                self._deliver(snapshot, result)
+
+        if self.pending <= 0:
+            self.pending = 0
+            self._unregister()
+
+    def _unregister(self):
+        """Unregister the tick listener if it is registered."""
+        if self._registered:
+            on_tick_listener_manager.unregister_listener(self._tick)
+            self._registered = False
+
+    @staticmethod
+    def _deliver(snapshot, result):
+        """Send the rendered lines or menu to the player."""
+        if not snapshot.for_menu:
+            chat_output.send(snapshot.index, result)
+            return
+
+        menu = SimpleMenu()
+        for section, title, lines in result:
+            menu.append(
+                SimpleOption(
+                    choice_index=section,
+                    text=TRANSLATION_STRINGS[f"Type:{title}"],
+                    selectable=False,
+                ),
+            )
+            menu.extend(lines)
+        menu.send(snapshot.index)
+
+
+stats_renderer = _StatsRenderer()
+
+
+# =============================================================================
+# >> HELPER FUNCTIONS
+# =============================================================================
+def get_distance_display(distance, setting):
+    """Return the formatted distance between players."""
+    feet = distance * 0.0375
+    if setting == 1:
+        return f"{feet:.2f}ft"
+    meters = feet * 0.3408
+    if setting == 0:
+        return f"{meters:.2f}m"
+    return f"{meters:.2f}m ({feet:.2f}ft)"
+
+
+def _get_kill_info(player, userid):
+    """Return the last kill's info, the accuracy and any kill totals."""
+    kill_info = player.killed.get(userid)
+    if kill_info is None:
+        return None
+
+    shots, hits = player.weapons.get(weapon_ids[kill_info.weapon])[:2]
+    return (
+        kill_info.weapon,
+        kill_info.distance,
+        kill_info.headshot,
+        (hits, shots) if shots else None,
+        (kill_info.kills, kill_info.headshots, kill_info.longest)
+        if kill_info.kills > 1 else None,
+    )
@@ -0,0 +1,88 @@
+# ../victim_stats/scheduler.py
+
+"""Spreads sending round end stats over multiple server ticks."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python
+from collections import deque
+from time import perf_counter
+
+# Source.Python
+from listeners import on_tick_listener_manager
+
+# Plugin
+from .config import round_end_players_per_tick, round_end_tick_budget
+from .players import player_dictionary
+
+# =============================================================================
+# >> ALL DECLARATION
+# =============================================================================
+__all__ = (
+    "stats_scheduler",
+)
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class _StatsScheduler(deque):
+    """Queues players to send their stats to over the following ticks."""
+
+    def __init__(self):
+        """Store whether the tick listener is registered."""
+        super().__init__()
+        self._registered = False
+
+    def add(self, userid, **kill):
+        """Queue the player to be sent their stats and any killer info."""
+        self.append((userid, kill))
+        if not self._registered:
+            on_tick_listener_manager.register_listener(self._tick)
+            self._registered = True
+
+    def flush(self):
+        """Send all queued players their stats immediately."""
+        while self:
+            self._send(self.popleft())
+        self._unregister()
+
+    def clear(self):
+        """Remove all queued players without sending their stats."""
+        super().clear()
+        self._unregister()
+
+    def _tick(self):
+        """Send stats to the next players in the queue."""
+        players_per_tick = int(round_end_players_per_tick)
+        budget = float(round_end_tick_budget) / 1000
+        end_time = perf_counter() + budget
+        count = 0
+        while self:
+            self._send(self.popleft())
+            count += 1
+            if players_per_tick and count >= players_per_tick:
+                break
+            if budget and perf_counter() >= end_time:
+                break
+
+        if not self:
+            self._unregister()
+
+    def _unregister(self):
+        """Unregister the tick listener if it is registered."""
+        if self._registered:
+            on_tick_listener_manager.unregister_listener(self._tick)
+            self._registered = False
+
+    @staticmethod
+    def _send(item):
+        """Send the player their stats if any were recorded."""
+        userid, kill = item
+        player = player_dictionary.get(userid)
+        if player is not None:
+            player.send_stats(**kill, scheduled=True)
+
+
+stats_scheduler = _StatsScheduler()
@@ -0,0 +1,166 @@
+# ../victim_stats/shedding.py
+
+"""Reduces the stats sent on death while the server is overloaded."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python
+from array import array
+from time import perf_counter_ns
+
+# Source.Python
+from engines.server import global_vars
+from listeners import on_tick_listener_manager
+
+# Plugin
+from .config import load_shedding, shed_frame_ratio, shed_plugin_time
+
+# =============================================================================
+# >> ALL DECLARATION
+# =============================================================================
+__all__ = (
+    "LEVEL_DEFERRED",
+    "LEVEL_FULL",
+    "LEVEL_KILLER_ONLY",
+    "LEVEL_NAMES",
+    "LEVEL_NO_HITGROUPS",
+    "load_shedder",
+)
+
+
+# =============================================================================
+# >> GLOBAL VARIABLES
+# =============================================================================
+# Each level drops more of the stats than the one before it
+LEVEL_FULL = 0
+LEVEL_NO_HITGROUPS = 1
+LEVEL_KILLER_ONLY = 2
+LEVEL_DEFERRED = 3
+LEVEL_NAMES = ("full", "no hitgroups", "killer only", "deferred")
+
+# Number of ticks between each check of the load
+CHECK_TICKS = 16
+
+# Weight of the newest tick in the moving averages
+SMOOTHING = 0.1
+
+# The level only drops once the load is below this share of the thresholds
+RECOVER_RATIO = 0.75
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class _LoadShedder:
+    """
+    Picks the level of stats to send from the recent load.
+
+    The time between ticks and the time spent sending stats during each
+    tick are kept as moving averages. Every few ticks the level goes up
+    by one while either is over its threshold, and back down by one once
+    both are comfortably under them again.
+    """
+
+    def __init__(self):
+        """Store the base values."""
+        self.level = LEVEL_FULL
+        self.counts = array("L", [0]) * len(LEVEL_NAMES)
+        self.deferred = {}
+        self.frame_time = 0.0
+        self.plugin_time = 0.0
+        self._spent = 0
+        self._last_time = 0
+        self._ticks = 0
+        self._registered = False
+
+    def start(self):
+        """Start watching the load if enabled."""
+        if not int(load_shedding) or self._registered:
+            return
+
+        self.reset()
+        on_tick_listener_manager.register_listener(self._tick)
+        self._registered = True
+
+    def stop(self):
+        """Stop watching the load and send full stats again."""
+        if self._registered:
+            on_tick_listener_manager.unregister_listener(self._tick)
+            self._registered = False
+        self.reset()
+
+    def reset(self):
+        """Forget the measured load and any deferred players."""
+        self.level = LEVEL_FULL
+        self.deferred.clear()
+        self.frame_time = 0.0
+        self.plugin_time = 0.0
+        self._spent = 0
+        self._last_time = 0
+
+    def get_level(self, *, scheduled=False):
+        """
+        Return and count the level to send the player's stats with.
+
+        Stats sent by the scheduler are already spread over the ticks,
+        so they are never deferred and at most have their hitgroups
+        dropped.
+        """
+        level = self.level
+        if scheduled:
+            level = min(level, LEVEL_NO_HITGROUPS)
+        self.counts[level] += 1
+        return level
+
+    def add_time(self, elapsed):
+        """Add the nanoseconds spent sending stats during this tick."""
+        self._spent += elapsed
+
+    def defer(self, userid, **kill):
+        """Store the killer's information to send at the end of the round."""
+        self.deferred[userid] = kill
+
+    def pop_deferred(self):
+        """Remove and return the deferred players and their killers."""
+        deferred = list(self.deferred.items())
+        self.deferred.clear()
+        return deferred
+
+    def _tick(self):
+        """Update the moving averages and check the load every few ticks."""
+        now = perf_counter_ns()
+        if self._last_time:
+            self.frame_time += (
+                (now - self._last_time) / 1e6 - self.frame_time
+            ) * SMOOTHING
+        self.plugin_time += (self._spent / 1e6 - self.plugin_time) * SMOOTHING
+        self._spent = 0
+        self._last_time = now
+
+        self._ticks += 1
+        if self._ticks % CHECK_TICKS:
+            return
+
+        pressure = self._get_pressure()
+        if pressure >= 1 and self.level < LEVEL_DEFERRED:
+            self.level += 1
+        elif pressure < RECOVER_RATIO and self.level > LEVEL_FULL:
+            self.level -= 1
+
+    def _get_pressure(self):
+        """Return the highest share of its threshold either load is at."""
+        pressure = 0.0
+        frame_ratio = float(shed_frame_ratio)
+        if frame_ratio > 0:
+            pressure = self.frame_time / (
+                global_vars.interval_per_tick * 1000 * frame_ratio
+            )
+
+        plugin_time = float(shed_plugin_time)
+        if plugin_time > 0:
+            pressure = max(pressure, self.plugin_time / plugin_time)
+        return pressure
+
+
+load_shedder = _LoadShedder()
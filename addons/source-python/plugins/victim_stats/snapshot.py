@@ -0,0 +1,474 @@
+# ../victim_stats/snapshot.py
+
+"""Saves the round's stats on unload so a reload can pick them back up."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python
+import struct
+from array import array
+from collections import defaultdict
+from struct import Struct
+
+# Source.Python
+from engines.server import global_vars
+from entities.entity import Entity
+from paths import PLUGIN_DATA_PATH
+
+# Plugin
+from .config import snapshot_on_reload
+from .info import info
+from .leaderboard import round_leaderboard
+from .players import (
+    DamageGroup,
+    PlayerDamage,
+    PlayerKill,
+    player_dictionary,
+)
+from .storage import stats_store
+from .teams import TeamTotals, team_totals
+from .templates import MAX_HITGROUPS
+from .weapons import WeaponCounters, weapon_ids
+
+# =============================================================================
+# >> ALL DECLARATION
+# =============================================================================
+__all__ = (
+    "SNAPSHOT_PATH",
+    "stats_snapshot",
+)
+
+
+# =============================================================================
+# >> GLOBAL VARIABLES
+# =============================================================================
+SNAPSHOT_PATH = PLUGIN_DATA_PATH / info.name / "snapshot.bin"
+
+# Game rules property that holds the game time the current round started
+ROUND_START_TIME = "cs_gamerules_data.m_fRoundStartTime"
+
+_MAGIC = b"VSSN"
+_VERSION = 4
+
+# Magic, version, item sizes of the "L" and "I" arrays, round start and the
+# game time the round started
+_HEADER = Struct("<4sBBBdd")
+_COUNT = Struct("<H")
+_USERID = Struct("<i")
+_PLAYER = Struct("<iHHHHH")
+_DAMAGE = Struct("<iII")
+# Opponent, kills, headshots, longest distance, logged kills and last kill
+_KILL = Struct("<iIIdBB")
+_TOTAL = Struct("<iI")
+_TEAM = Struct("<iIIII")
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class _StatsSnapshot:
+    """
+    Writes and reads the in-round stats in a compact binary format.
+
+    Every value is packed with a fixed layout and the hitgroup and weapon
+    arrays are copied as raw bytes, so no per-object pickling is done.
+    """
+
+    def save(self):
+        """Write the current stats and return whether any were written."""
+        if not (int(snapshot_on_reload) and player_dictionary):
+            return False
+
+        data = bytearray(
+            _HEADER.pack(
+                _MAGIC, _VERSION, array("L").itemsize, array("I").itemsize,
+                stats_store.round_start, _get_round_start_time(),
+            ),
+        )
+        _pack_string(data, global_vars.map_name)
+
+        # Weapon names, so the ids can be matched up again after the reload
+        data += _COUNT.pack(len(weapon_ids.names))
+        for name in weapon_ids.names:
+            _pack_string(data, name)
+
+        # Last known names and uniqueids of all players and opponents
+        data += _COUNT.pack(len(player_dictionary.names))
+        for userid, name in player_dictionary.names.items():
+            data += _USERID.pack(userid)
+            _pack_string(data, name)
+            _pack_string(data, player_dictionary.uniqueids.get(userid, ""))
+
+        data += _COUNT.pack(len(player_dictionary))
+        for userid, player in player_dictionary.items():
+            _pack_player(data, userid, player)
+
+        for totals in round_leaderboard.iter_totals():
+            data += _COUNT.pack(len(totals))
+            for userid, total in totals.items():
+                data += _TOTAL.pack(userid, total)
+
+        data += _COUNT.pack(len(team_totals))
+        for team, totals in team_totals.items():
+            data += _TEAM.pack(
+                team, totals.damage, totals.taken, totals.kills,
+                totals.headshots,
+            )
+            data += totals.hitgroups.tobytes()
+
+        SNAPSHOT_PATH.parent.makedirs_p()
+        with SNAPSHOT_PATH.open("wb") as open_file:
+            open_file.write(data)
+        return True
+
+    def restore(self):
+        """
+        Restore the stats if the snapshot is from the current round.
+
+        The stats in a snapshot from an earlier round or another map, and
+        those of players who left during the reload, are written to the
+        database instead so that they are never lost.
+        """
+        try:
+            with SNAPSHOT_PATH.open("rb") as open_file:
+                data = memoryview(open_file.read())
+        except FileNotFoundError:
+            return False
+
+        # Only ever use a snapshot once
+        SNAPSHOT_PATH.unlink()
+        try:
+            snapshot = _SnapshotReader(data).read()
+        except (struct.error, UnicodeDecodeError, ValueError):
+            return False
+
+        if snapshot is None:
+            return False
+
+        if not snapshot.is_current():
+            snapshot.store()
+            return False
+
+        snapshot.apply()
+        return True
+
+
+stats_snapshot = _StatsSnapshot()
+
+
+class _SnapshotPlayer:
+    """Stores a single player's stats as read from a snapshot."""
+
+    __slots__ = (
+        "killed",
+        "taken",
+        "uniqueid",
+        "userid",
+        "victims",
+        "weapons",
+        "wounded",
+    )
+
+    def __init__(self, userid, uniqueid):
+        """Create the empty stats for the player."""
+        self.userid = userid
+        self.uniqueid = uniqueid
+        self.taken = DamageGroup()
+        self.wounded = DamageGroup()
+        self.victims = DamageGroup()
+        self.killed = defaultdict(PlayerKill)
+        self.weapons = WeaponCounters()
+
+
+class _SnapshotData:
+    """Stores everything read from a snapshot until it is used."""
+
+    def __init__(self, map_name, round_start, round_start_time):
+        """Store where and in which round the snapshot was taken."""
+        self.map_name = map_name
+        self.round_start = round_start
+        self.round_start_time = round_start_time
+        self.names = {}
+        self.uniqueids = {}
+        self.players = []
+        self.leaderboard = {}
+        self.teams = {}
+
+    def is_current(self):
+        """Return whether the snapshot is from the current round."""
+        round_start_time = _get_round_start_time()
+        return (
+            self.map_name == global_vars.map_name and
+            round_start_time > 0 and
+            self.round_start_time == round_start_time
+        )
+
+    def apply(self):
+        """Restore the stats, storing those of players who have left."""
+        for stored in self.players:
+            try:
+                player = player_dictionary[stored.userid]
+            except ValueError:
+                self._store_player(stored)
+                continue
+
+            player.taken = stored.taken
+            player.wounded = stored.wounded
+            player.victims = stored.victims
+            player.killed = stored.killed
+            player.weapons = stored.weapons
+
+        for category, totals in round_leaderboard.iter_categories():
+            for userid, total in self.leaderboard[category]:
+                totals.add(userid, total)
+
+        team_totals.update(self.teams)
+
+        # Keep names of opponents who are not in the dictionary themselves
+        for userid, name in self.names.items():
+            player_dictionary.names.setdefault(userid, name)
+            player_dictionary.uniqueids.setdefault(
+                userid,
+                self.uniqueids[userid],
+            )
+
+        stats_store.round_start = self.round_start
+
+    def store(self):
+        """Write every player's stats to the database."""
+        for stored in self.players:
+            self._store_player(stored)
+
+    def _store_player(self, stored):
+        """Write the player's stats for the snapshot's map and round."""
+        stats_store.add(
+            stored,
+            map_name=self.map_name,
+            round_start=self.round_start,
+            uniqueids=self.uniqueids,
+        )
+
+
+class _SnapshotReader:
+    """Reads each section of a snapshot in the order it was written."""
+
+    def __init__(self, data):
+        """Store the data to read from."""
+        self.data = data
+        self.offset = 0
+        self.weapons = []
+        self.same_weapons = True
+
+    def read(self):
+        """Return the snapshot's contents, or None if not a snapshot."""
+        snapshot = self._read_header()
+        if snapshot is None:
+            return None
+
+        self._read_weapons()
+        self._read_names(snapshot)
+        (count,) = self._unpack(_COUNT)
+        snapshot.players = [
+            self._read_player(snapshot.uniqueids) for _ in range(count)
+        ]
+        snapshot.leaderboard = {
+            category: self._read_totals()
+            for category, _totals in round_leaderboard.iter_categories()
+        }
+        self._read_teams(snapshot)
+        return snapshot
+
+    def _unpack(self, layout):
+        """Return the values at the current offset and move past them."""
+        values = layout.unpack_from(self.data, self.offset)
+        self.offset += layout.size
+        return values
+
+    def _read_bytes(self, size):
+        """Return the next number of bytes and move past them."""
+        value = self.data[self.offset:self.offset + size]
+        self.offset += size
+        return value
+
+    def _read_string(self):
+        """Return the next length prefixed string."""
+        value, self.offset = _unpack_string(self.data, self.offset)
+        return value
+
+    def _read_array(self, typecode, count):
+        """Return an array of the next number of items of the type."""
+        values = array(typecode)
+        values.frombytes(self._read_bytes(count * values.itemsize))
+        return values
+
+    def _read_header(self):
+        """Return the snapshot's map and round if it is compatible."""
+        (
+            magic, version, long_size, int_size, round_start,
+            round_start_time,
+        ) = self._unpack(_HEADER)
+        if (magic, version, long_size, int_size) != (
+            _MAGIC, _VERSION, array("L").itemsize, array("I").itemsize,
+        ):
+            return None
+
+        return _SnapshotData(
+            self._read_string(), round_start, round_start_time,
+        )
+
+    def _read_weapons(self):
+        """Match up the stored weapon ids with the current ones."""
+        (count,) = self._unpack(_COUNT)
+        self.weapons = [weapon_ids[self._read_string()] for _ in range(count)]
+        self.same_weapons = self.weapons == list(range(count))
+
+    def _read_names(self, snapshot):
+        """Read the last known names and uniqueids of every userid."""
+        (count,) = self._unpack(_COUNT)
+        for userid, name, uniqueid in [
+            self._read_name() for _ in range(count)
+        ]:
+            snapshot.names[userid] = name
+            snapshot.uniqueids[userid] = uniqueid
+
+    def _read_name(self):
+        """Return the next userid along with its name and uniqueid."""
+        (userid,) = self._unpack(_USERID)
+        return userid, self._read_string(), self._read_string()
+
+    def _read_player(self, uniqueids):
+        """Return the next player's stats."""
+        (
+            userid, taken, wounded, victims, killed, weapon_count,
+        ) = self._unpack(_PLAYER)
+        player = _SnapshotPlayer(userid, uniqueids.get(userid, ""))
+        for group, count in (
+            (player.taken, taken),
+            (player.wounded, wounded),
+            (player.victims, victims),
+        ):
+            for opponent, values in [
+                self._read_damage() for _ in range(count)
+            ]:
+                group.add(opponent, values)
+
+        player.killed.update(self._read_kill() for _ in range(killed))
+
+        for name in ("shots", "hits", "damage", "kills"):
+            setattr(
+                player.weapons,
+                name,
+                self._remap_counters(self._read_array("L", weapon_count)),
+            )
+        return player
+
+    def _read_damage(self):
+        """Return the next opponent and the damage done to or by them."""
+        opponent, damage, hits = self._unpack(_DAMAGE)
+        values = PlayerDamage()
+        values.damage = damage
+        values.hits = hits
+        values.hitgroups = self._read_array("I", MAX_HITGROUPS)
+        return opponent, values
+
+    def _read_kill(self):
+        """Return the next victim along with their totals and kill log."""
+        (
+            opponent, kills, headshots, longest, logged, last,
+        ) = self._unpack(_KILL)
+        values = PlayerKill()
+        values.kills = kills
+        values.headshots = headshots
+        values.longest = longest
+        values.last = last if logged else -1
+        values.weapons = self._read_array("H", logged)
+        values.headshot_flags = self._read_array("B", logged)
+        values.distances = self._read_array("f", logged)
+        if not self.same_weapons:
+            values.weapons = array(
+                "H",
+                [self.weapons[weapon] for weapon in values.weapons],
+            )
+        return opponent, values
+
+    def _remap_counters(self, values):
+        """Return the weapon counters indexed by the current weapon ids."""
+        if self.same_weapons:
+            return values
+
+        remapped = array("L", [0]) * len(weapon_ids.names)
+        for weapon, value in enumerate(values):
+            remapped[self.weapons[weapon]] = value
+        return remapped
+
+    def _read_totals(self):
+        """Return the userids and totals of a leaderboard category."""
+        (count,) = self._unpack(_COUNT)
+        return [self._unpack(_TOTAL) for _ in range(count)]
+
+    def _read_teams(self, snapshot):
+        """Read each team's totals."""
+        (count,) = self._unpack(_COUNT)
+        snapshot.teams.update(self._read_team() for _ in range(count))
+
+    def _read_team(self):
+        """Return the next team's number and totals."""
+        team, damage, taken, kills, headshots = self._unpack(_TEAM)
+        totals = TeamTotals()
+        totals.damage = damage
+        totals.taken = taken
+        totals.kills = kills
+        totals.headshots = headshots
+        totals.hitgroups = self._read_array("I", MAX_HITGROUPS)
+        return team, totals
+
+
+# =============================================================================
+# >> HELPER FUNCTIONS
+# =============================================================================
+def _get_round_start_time():
+    """Return the game time the current round started, or 0 if unknown."""
+    game_rules = Entity.find("cs_gamerules")
+    if game_rules is None:
+        return 0.0
+    return game_rules.get_network_property_float(ROUND_START_TIME)
+
+
+def _pack_player(data, userid, player):
+    """Add the player's damage, kills and weapon counters to the data."""
+    weapons = player.weapons
+    data += _PLAYER.pack(
+        userid, len(player.taken), len(player.wounded),
+        len(player.victims), len(player.killed), len(weapons.shots),
+    )
+    for group in (player.taken, player.wounded, player.victims):
+        for opponent, values in group.items():
+            data += _DAMAGE.pack(opponent, values.damage, values.hits)
+            data += values.hitgroups.tobytes()
+    for opponent, values in player.killed.items():
+        data += _KILL.pack(
+            opponent, values.kills, values.headshots, values.longest,
+            len(values.weapons), max(values.last, 0),
+        )
+        data += values.weapons.tobytes()
+        data += values.headshot_flags.tobytes()
+        data += values.distances.tobytes()
+    for counters in (
+        weapons.shots, weapons.hits, weapons.damage, weapons.kills,
+    ):
+        data += counters.tobytes()
+
+
+def _pack_string(data, value):
+    """Add the length prefixed UTF-8 value to the data."""
+    encoded = value.encode()
+    data += _COUNT.pack(len(encoded))
+    data += encoded
+
+
+def _unpack_string(data, offset):
+    """Return the length prefixed string at the offset and the next offset."""
+    (length,) = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    return str(data[offset:offset + length], "utf-8"), offset + length
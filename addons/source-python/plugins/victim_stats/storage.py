@@ -0,0 +1,216 @@
+# ../victim_stats/storage.py
+
+"""Persists each round's victim stats to a local SQLite database."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python
+from contextlib import suppress
+from queue import Empty, Full, Queue
+from time import time
+
+# Source.Python
+from core import echo_console
+from engines.server import global_vars
+from listeners.tick import GameThread
+from paths import PLUGIN_DATA_PATH
+
+# Plugin
+from .config import persist_stats
+from .info import info
+from .players import player_dictionary
+
+# =============================================================================
+# >> ALL DECLARATION
+# =============================================================================
+__all__ = (
+    "DATABASE_PATH",
+    "stats_store",
+)
+
+
+# =============================================================================
+# >> GLOBAL VARIABLES
+# =============================================================================
+DATABASE_PATH = PLUGIN_DATA_PATH / info.name / "victim_stats.db"
+
+# Maximum number of players' stats waiting to be written
+MAX_QUEUE_SIZE = 4096
+
+# Maximum number of queued players' stats to write in a single transaction
+MAX_BATCH_SIZE = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS damage (
+    map TEXT NOT NULL,
+    round_start REAL NOT NULL,
+    player TEXT NOT NULL,
+    opponent TEXT NOT NULL,
+    taken INTEGER NOT NULL,
+    damage INTEGER NOT NULL,
+    hits INTEGER NOT NULL,
+    hitgroups BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS kills (
+    map TEXT NOT NULL,
+    round_start REAL NOT NULL,
+    player TEXT NOT NULL,
+    opponent TEXT NOT NULL,
+    kills INTEGER NOT NULL,
+    weapon TEXT,
+    headshot INTEGER NOT NULL,
+    distance REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS damage_player ON damage (player);
+CREATE INDEX IF NOT EXISTS kills_player ON kills (player);
+"""
+
+_INSERT_DAMAGE = "INSERT INTO damage VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+_INSERT_KILLS = "INSERT INTO kills VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+
+# Queued to tell the writer to stop once everything before it is written
+_STOP = object()
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class _StatsWriter(GameThread):
+    """Writes the queued stats to the database in batches."""
+
+    def __init__(self, queue):
+        """Store the queue to write from."""
+        super().__init__(name=f"{info.name}.storage", daemon=True)
+        self.queue = queue
+
+    def run(self):
+        """Write the queued stats until told to stop."""
+        # Import here so loading the plugin does not have to
+        import sqlite3  # noqa: PLC0415
+
+        DATABASE_PATH.parent.makedirs_p()
+        connection = sqlite3.connect(DATABASE_PATH)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_SCHEMA)
+        try:
+            running = True
+            while running:
+                batch = [self.queue.get()]
+                while len(batch) < MAX_BATCH_SIZE:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except Empty:
+                        break
+
+                running = _STOP not in batch
+                with connection:
+                    for item in batch:
+                        if item is _STOP:
+                            continue
+                        damage_rows, kill_rows = item
+                        connection.executemany(_INSERT_DAMAGE, damage_rows)
+                        connection.executemany(_INSERT_KILLS, kill_rows)
+        finally:
+            connection.close()
+
+
+class _StatsStore:
+    """Queues each player's stats for the writer as they are discarded."""
+
+    def __init__(self):
+        """Store the base values."""
+        self.queue = Queue(maxsize=MAX_QUEUE_SIZE)
+        self.writer = None
+        self.round_start = time()
+        self.dropped = 0
+
+    def start_round(self):
+        """Mark the start of a new round for the stats that follow."""
+        self.round_start = time()
+
+    def add(self, player, *, map_name=None, round_start=None, uniqueids=None):
+        """
+        Queue the player's stats to be written to the database.
+
+        The stats are stored for the current map and round unless another
+        map, round start or opponent uniqueids are given.
+        """
+        if not int(persist_stats):
+            return
+
+        if map_name is None:
+            map_name = global_vars.map_name
+        if round_start is None:
+            round_start = self.round_start
+        if uniqueids is None:
+            uniqueids = player_dictionary.uniqueids
+        damage_rows = [
+            (
+                map_name, round_start, player.uniqueid,
+                uniqueids.get(userid, ""), taken, values.damage, values.hits,
+                values.hitgroups.tobytes(),
+            )
+            for taken, group in (
+                (True, player.taken),
+                (False, player.wounded),
+                (False, player.victims),
+            )
+            for userid, values in group.items()
+        ]
+        # Store the number of headshots and the longest of all the kills
+        kill_rows = [
+            (
+                map_name, round_start, player.uniqueid,
+                uniqueids.get(userid, ""), values.kills, values.weapon,
+                values.headshots, values.longest,
+            )
+            for userid, values in player.killed.items()
+        ]
+        if not (damage_rows or kill_rows):
+            return
+
+        if self.writer is None:
+            self.writer = _StatsWriter(self.queue)
+            self.writer.start()
+
+        # Did the writer stop on an error?
+        elif not self.writer.is_alive():
+            self.dropped += 1
+            return
+
+        # Never block the game thread, drop the stats if the writer is behind
+        try:
+            self.queue.put_nowait((damage_rows, kill_rows))
+        except Full:
+            self.dropped += 1
+
+    def close(self):
+        """Tell the writer to stop once it has written all queued stats."""
+        writer = self.writer
+        if writer is None:
+            return
+
+        self.writer = None
+        queue = self.queue
+        self.queue = Queue(maxsize=MAX_QUEUE_SIZE)
+        if not writer.is_alive():
+            self.dropped += queue.qsize()
+            return
+
+        # Never wait for the writer, drop a batch to make room if it is behind
+        try:
+            queue.put_nowait(_STOP)
+        except Full:
+            with suppress(Empty):
+                queue.get_nowait()
+            self.dropped += 1
+            queue.put_nowait(_STOP)
+            echo_console(
+                f"{info.name}: the database writer is behind, "
+                "dropped a batch of stats to stop it.",
+            )
+
+
+stats_store = _StatsStore()
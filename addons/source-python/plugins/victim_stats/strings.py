@@ -23,5 +23,40 @@ __all__ = (
 # =============================================================================
 # >> GLOBAL VARIABLES
 # =============================================================================
+# The config strings are needed to create the convars on import
 CONFIG_STRINGS = LangStrings(f"{info.name}/config_strings")
-TRANSLATION_STRINGS = LangStrings(f"{info.name}/strings")
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class _LazyLangStrings:
+    """Parses the translation file the first time any string is used."""
+
+    __slots__ = ("_name", "_strings")
+
+    def __init__(self, name):
+        """Store the name of the translation file."""
+        self._name = name
+        self._strings = None
+
+    def __getitem__(self, item):
+        """Return the translations for the given string."""
+        return self._load()[item]
+
+    def __contains__(self, item):
+        """Return whether the given string exists."""
+        return item in self._load()
+
+    def __iter__(self):
+        """Iterate over the names of all strings."""
+        return iter(self._load())
+
+    def _load(self):
+        """Parse the translation file if it has not been parsed yet."""
+        if self._strings is None:
+            self._strings = LangStrings(self._name)
+        return self._strings
+
+
+TRANSLATION_STRINGS = _LazyLangStrings(f"{info.name}/strings")
@@ -0,0 +1,160 @@
+# ../victim_stats/teams.py
+
+"""Keeps each team's totals for the round and sends them at round end."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Source.Python
+from filters.players import PlayerIter
+from menus import SimpleMenu, SimpleOption
+from players.helpers import get_client_language
+
+# Plugin
+from .config import team_summary
+from .output import chat_output
+from .players import settings_cache
+from .strings import TRANSLATION_STRINGS
+from .templates import (
+    EMPTY_HITGROUPS,
+    MAX_HITGROUPS,
+    get_hitgroup,
+    message_templates,
+)
+
+# =============================================================================
+# >> ALL DECLARATION
+# =============================================================================
+__all__ = (
+    "TeamTotals",
+    "team_totals",
+)
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class TeamTotals:
+    """Stores a single team's totals for the round."""
+
+    __slots__ = ("damage", "headshots", "hitgroups", "kills", "taken")
+
+    def __init__(self):
+        """Store the base totals."""
+        self.damage = 0
+        self.taken = 0
+        self.kills = 0
+        self.headshots = 0
+        self.hitgroups = EMPTY_HITGROUPS[:]
+
+    def __bool__(self):
+        """Return whether the team dealt or took any damage."""
+        return bool(self.damage or self.taken or self.kills)
+
+    def clear(self):
+        """Reset the totals for a new round."""
+        self.damage = 0
+        self.taken = 0
+        self.kills = 0
+        self.headshots = 0
+        self.hitgroups[:] = EMPTY_HITGROUPS
+
+    def get_headshot_percent(self):
+        """Return the percentage of the team's kills that were headshots."""
+        if not self.kills:
+            return 0.0
+        return self.headshots * 100 / self.kills
+
+    def get_most_hit(self):
+        """Return the hitgroup the team hit the most, or None if none."""
+        hitgroups = self.hitgroups
+        most_hit = max(range(MAX_HITGROUPS), key=hitgroups.__getitem__)
+        return most_hit if hitgroups[most_hit] else None
+
+
+class _TeamTotalsDictionary(dict):
+    """
+    Stores the totals of each team by its number.
+
+    The totals are added to as each hit and kill happens, so the round
+    end summary only has to read a few counters for each team.
+    """
+
+    def __missing__(self, team):
+        """Create the totals for the missing team."""
+        value = self[team] = TeamTotals()
+        return value
+
+    def __bool__(self):
+        """Return whether any team has totals this round."""
+        return any(self.values())
+
+    def add_hit(self, attacker_team, victim_team, damage, hitgroup):
+        """Add the hit to the attacker's and the victim's team."""
+        attacker = self[attacker_team]
+        attacker.damage += damage
+        attacker.hitgroups[get_hitgroup(hitgroup)] += 1
+
+        self[victim_team].taken += damage
+
+    def add_kill(self, team, *, headshot):
+        """Add a kill for the team."""
+        totals = self[team]
+        totals.kills += 1
+        if headshot:
+            totals.headshots += 1
+
+    def clear(self):
+        """Reset every team's totals for a new round."""
+        for totals in self.values():
+            totals.clear()
+
+    def iter_messages(self, templates):
+        """Yield the line for each team that has any totals."""
+        for team, totals in sorted(self.items()):
+            if not totals:
+                continue
+
+            most_hit = totals.get_most_hit()
+            yield templates.team_summary(
+                team=templates.teams.get(team, str(team)),
+                damage=totals.damage,
+                taken=totals.taken,
+                kills=totals.kills,
+                headshots=totals.get_headshot_percent(),
+                hitgroup="-" if most_hit is None
+                else templates.hitgroups[most_hit],
+            )
+
+    def send(self):
+        """Send the summary to all dead and spectating human players."""
+        if not (self and int(team_summary)):
+            return
+
+        lines = {}
+        for player in PlayerIter(not_filters=["alive", "bot"]):
+            index = player.index
+            for_menu = settings_cache[index][0] not in (1, 2)
+            key = get_client_language(index), for_menu
+            if key not in lines:
+                lines[key] = list(
+                    self.iter_messages(message_templates[key]),
+                )
+
+            if not for_menu:
+                chat_output.send(index, lines[key])
+                continue
+
+            menu = SimpleMenu()
+            menu.append(
+                SimpleOption(
+                    choice_index=1,
+                    text=TRANSLATION_STRINGS["Type:Teams"],
+                    selectable=False,
+                ),
+            )
+            menu.extend("  " + line for line in lines[key])
+            menu.send(index)
+
+
+team_totals = _TeamTotalsDictionary()
@@ -0,0 +1,252 @@
+# ../victim_stats/templates.py
+
+"""Precompiles the translated message templates for each language."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python
+from array import array
+from string import Formatter
+
+# Plugin
+from .colors import (
+    ATTACKER_COLOR,
+    KILLED_COLOR,
+    KILLER_COLOR,
+    LEADERBOARD_COLOR,
+    TEAM_SUMMARY_COLOR,
+    TIMELINE_COLOR,
+    WOUNDED_COLOR,
+)
+from .strings import TRANSLATION_STRINGS
+
+# =============================================================================
+# >> ALL DECLARATION
+# =============================================================================
+__all__ = (
+    "EMPTY_HITGROUPS",
+    "MAX_HITGROUPS",
+    "MessageTemplates",
+    "get_hitgroup",
+    "message_templates",
+)
+
+
+# =============================================================================
+# >> GLOBAL VARIABLES
+# =============================================================================
+# Hitgroups run from 0 (generic) through 7, with 10 being used for gear
+MAX_HITGROUPS = 11
+
+# Copied to create the hit counts of each hitgroup
+EMPTY_HITGROUPS = array("I", [0]) * MAX_HITGROUPS
+
+# Colors used for each type of message in chat
+_TYPE_COLORS = {
+    "Attacker": ATTACKER_COLOR,
+    "Wounded": WOUNDED_COLOR,
+    "Killed": KILLED_COLOR,
+}
+
+_formatter = Formatter()
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class MessageTemplates:
+    """
+    Stores the formatters for a single language and output mode.
+
+    Colors and translated words are filled in when the templates are
+    built, leaving only the per-message values to be formatted.
+    """
+
+    __slots__ = (
+        "accuracy",
+        "base",
+        "headshot",
+        "hitgroups",
+        "kill_log",
+        "killer",
+        "killer_dead",
+        "leaderboard",
+        "leaderboard_player",
+        "suicide",
+        "team_killed",
+        "team_summary",
+        "teams",
+        "timeline",
+        "types",
+        "weapon",
+    )
+
+    def __init__(self, language, *, for_menu):
+        """Build the templates for the given language and output mode."""
+        self.types = {
+            string_name: TRANSLATION_STRINGS[f"Type:{string_name}"].get_string(
+                language,
+            )
+            for string_name in (
+                *_TYPE_COLORS, "Attackers", "Killer", "Timeline",
+            )
+        }
+        self.headshot = (
+            "" if for_menu
+            else TRANSLATION_STRINGS["Headshot"].get_string(language)
+        )
+        self.base = {
+            string_name: self._compile(
+                name="Base",
+                language=language,
+                type_color="" if for_menu else color,
+                type="" if for_menu else self.types[string_name],
+                name_color="" if for_menu else "\x04",
+                damage_color="" if for_menu else "\x01",
+            )
+            for string_name, color in _TYPE_COLORS.items()
+        }
+        self.weapon = self._compile(
+            name="Base:Weapon",
+            language=language,
+            weapon_color="" if for_menu else "\x05",
+            at_color="" if for_menu else "\x01",
+            distance_color="" if for_menu else "\x04",
+        )
+        self.accuracy = self._compile(name="Base:Accuracy", language=language)
+        self.kill_log = self._compile(name="Base:KillLog", language=language)
+        self.killer = self._compile(
+            name="Killer",
+            language=language,
+            type_color="" if for_menu else KILLER_COLOR,
+            name_color="" if for_menu else "\x04",
+        )
+        self.killer_dead = self._compile(
+            name="Killer:Dead",
+            language=language,
+            type_color="" if for_menu else KILLER_COLOR,
+            name_color="" if for_menu else "\x04",
+        )
+        self.timeline = self._compile(
+            name="Timeline",
+            language=language,
+            type_color="" if for_menu else TIMELINE_COLOR,
+            name_color="" if for_menu else "\x04",
+            weapon_color="" if for_menu else "\x05",
+            at_color="" if for_menu else "\x01",
+        )
+        self.leaderboard = {
+            category: self._compile(
+                name=f"Leaderboard:{category}",
+                language=language,
+                type_color="" if for_menu else LEADERBOARD_COLOR,
+                name_color="" if for_menu else "\x01",
+            )
+            for category in ("Damage", "Kills", "Headshots")
+        }
+        self.leaderboard_player = self._compile(
+            name="Leaderboard:Player",
+            language=language,
+        )
+        self.team_summary = self._compile(
+            name="Team Summary",
+            language=language,
+            type_color="" if for_menu else TEAM_SUMMARY_COLOR,
+            name_color="" if for_menu else "\x01",
+        )
+        self.teams = {
+            team: TRANSLATION_STRINGS[f"Team:{team}"].get_string(language)
+            for team in (2, 3)
+        }
+        self.suicide = self._compile(name="Suicide", language=language)
+        self.team_killed = self._compile(
+            name="Team Killed",
+            language=language,
+        )
+
+        # Store the hitgroup names by their id, using generic for unknowns
+        generic = TRANSLATION_STRINGS["Hitgroup:0"].get_string(language)
+        self.hitgroups = tuple(
+            TRANSLATION_STRINGS[f"Hitgroup:{hitgroup}"].get_string(language)
+            if f"Hitgroup:{hitgroup}" in TRANSLATION_STRINGS else generic
+            for hitgroup in range(MAX_HITGROUPS)
+        )
+
+    @staticmethod
+    def _compile(name, language, **tokens):
+        """
+        Return a formatter with the given tokens already filled in.
+
+        Every token not given is left in place as a replacement field
+        so that it can be filled in later by the returned formatter.
+        """
+        strings = TRANSLATION_STRINGS[name]
+        for token in _get_fields(strings):
+            tokens.setdefault(token, _Placeholder(token))
+        return strings.get_string(language, **tokens).format
+
+
+class _Placeholder:
+    """Formats as the replacement field it stands in for."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        """Store the name of the field."""
+        self.name = name
+
+    def __format__(self, format_spec):
+        """Return the field along with its format spec."""
+        if format_spec:
+            return f"{{{self.name}:{format_spec}}}"
+        return f"{{{self.name}}}"
+
+
+class _MessageTemplateCache(dict):
+    """
+    Stores the templates by language and whether they are for a menu.
+
+    Templates for every translated language are built in load(), so the
+    translations are only parsed once the plugin is loaded and never
+    during a round. Any other language is built on first use.
+    """
+
+    def __missing__(self, key):
+        """Build the templates for the missing language and output mode."""
+        language, for_menu = key
+        value = self[key] = MessageTemplates(language, for_menu=for_menu)
+        return value
+
+    def build(self):
+        """Build the templates for every language with translations."""
+        self.clear()
+        for language in TRANSLATION_STRINGS["Base"]:
+            for for_menu in (False, True):
+                self[language, for_menu] = MessageTemplates(
+                    language,
+                    for_menu=for_menu,
+                )
+
+
+message_templates = _MessageTemplateCache()
+
+
+# =============================================================================
+# >> HELPER FUNCTIONS
+# =============================================================================
+def get_hitgroup(hitgroup):
+    """Return the hitgroup, counting unknown hitgroups as generic."""
+    if not 0 <= hitgroup < MAX_HITGROUPS:
+        return 0
+    return hitgroup
+
+
+def _get_fields(strings):
+    """Return the names of all replacement fields in the given strings."""
+    return {
+        field_name
+        for value in strings.values()
+        for _, field_name, _, _ in _formatter.parse(value)
+        if field_name
+    }
@@ -0,0 +1,126 @@
+# ../victim_stats/timeline.py
+
+"""Stores the most recent hits taken by each player in fixed-size buffers."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python
+from array import array
+
+# Plugin
+from .config import hit_timeline_size
+
+# =============================================================================
+# >> ALL DECLARATION
+# =============================================================================
+__all__ = (
+    "HitTimeline",
+    "hit_timelines",
+)
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class HitTimeline:
+    """
+    Ring buffer of the hits a player has taken during their life.
+
+    All arrays are allocated once with a fixed capacity, so adding a hit
+    never allocates and the oldest hits are overwritten once it is full.
+    """
+
+    __slots__ = (
+        "attackers",
+        "capacity",
+        "count",
+        "damage",
+        "health",
+        "hitgroups",
+        "position",
+        "ticks",
+        "weapons",
+    )
+
+    def __init__(self, capacity):
+        """Allocate the arrays for the given number of hits."""
+        self.capacity = capacity
+        self.ticks = array("l", [0]) * capacity
+        self.attackers = array("i", [0]) * capacity
+        self.weapons = array("H", [0]) * capacity
+        self.hitgroups = array("B", [0]) * capacity
+        self.damage = array("H", [0]) * capacity
+        self.health = array("H", [0]) * capacity
+        self.position = 0
+        self.count = 0
+
+    def __len__(self):
+        """Return the number of hits stored."""
+        return self.count
+
+    def __iter__(self):
+        """
+        Yield each stored hit from the oldest to the most recent.
+
+        Each hit is a tuple of tick, attacker userid, weapon id, hitgroup,
+        damage and remaining health.
+        """
+        start = (self.position - self.count) % self.capacity
+        for offset in range(self.count):
+            index = (start + offset) % self.capacity
+            yield (
+                self.ticks[index],
+                self.attackers[index],
+                self.weapons[index],
+                self.hitgroups[index],
+                self.damage[index],
+                self.health[index],
+            )
+
+    def add(self, tick, attacker, weapon, hitgroup, damage, health):
+        """Store the hit, overwriting the oldest hit if full."""
+        index = self.position
+        self.ticks[index] = tick
+        self.attackers[index] = attacker
+        self.weapons[index] = weapon
+        self.hitgroups[index] = hitgroup
+        self.damage[index] = min(damage, 0xFFFF)
+        self.health[index] = max(0, min(health, 0xFFFF))
+        self.position = (index + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def reset(self):
+        """Forget all stored hits while keeping the arrays."""
+        self.position = 0
+        self.count = 0
+
+
+class _HitTimelineDictionary(dict):
+    """Stores a reusable timeline for each player by userid."""
+
+    def __missing__(self, userid):
+        """Create a timeline with the configured capacity."""
+        value = self[userid] = HitTimeline(int(hit_timeline_size))
+        return value
+
+    def __delitem__(self, userid):
+        """Remove the player only if they are in the dictionary."""
+        if userid in self:
+            super().__delitem__(userid)
+
+    def reset(self, userid):
+        """Reset the player's timeline for their new life."""
+        timeline = self.get(userid)
+        if timeline is None:
+            return
+
+        # Reallocate if the configured size has changed
+        if timeline.capacity != int(hit_timeline_size):
+            del self[userid]
+        else:
+            timeline.reset()
+
+
+hit_timelines = _HitTimelineDictionary()
@@ -6,19 +6,127 @@
 # >> IMPORTS
 # =============================================================================
 # Source.Python
+from commands.server import ServerCommand
+from core import echo_console
+from engines.server import global_vars
 from events import Event
 from filters.players import PlayerIter
+from listeners import (
+    OnClientDisconnect,
+    OnClientSettingsChanged,
+    OnLevelInit,
+    OnLevelShutdown,
+)
+from players.entity import Player
 
 # Plugin
-from .players import PlayerStats, player_dictionary
+from .bots import bot_userids
+from .config import (
+    heatmap_stats,
+    hit_timeline_size,
+    record_events,
+    skip_bot_pairs,
+)
+from .export import stats_export
+from .heatmap import stats_heatmap
+from .leaderboard import round_leaderboard
+from .output import chat_output
+from .players import PlayerStats, player_dictionary, settings_cache
+from .profiling import profiler
+from .recorder import event_recorder
+from .render import stats_renderer
+from .scheduler import stats_scheduler
+from .shedding import LEVEL_NAMES, load_shedder
+from .snapshot import stats_snapshot
+from .storage import stats_store
+from .teams import team_totals
+from .templates import message_templates
+from .timeline import hit_timelines
+from .weapons import weapon_ids
+
+
+# =============================================================================
+# >> GLOBAL VARIABLES
+# =============================================================================
+# Positions of the optional vs_heatmap arguments and their defaults
+HEATMAP_COUNT_ARGUMENT = 2
+HEATMAP_MIN_HITS_ARGUMENT = 3
+DEFAULT_HEATMAP_COUNT = 10
+DEFAULT_HEATMAP_MIN_HITS = 50
+
+
+# =============================================================================
+# >> LOAD & UNLOAD
+# =============================================================================
+def load():
+    """Build the message templates and restore any stats from a reload."""
+    message_templates.build()
+    bot_userids.refresh()
+    stats_snapshot.restore()
+    if int(heatmap_stats):
+        stats_heatmap.warm_up()
+    if int(record_events):
+        event_recorder.start()
+    stats_renderer.start()
+    load_shedder.start()
+    stats_export.start()
+
+
+def unload():
+    """Stop sending any queued messages and save or write all stats."""
+    profiler.disable()
+    stats_export.stop()
+    event_recorder.stop()
+    stats_scheduler.clear()
+    stats_renderer.stop()
+    load_shedder.stop()
+    chat_output.clear()
+    stats_heatmap.close()
+
+    # Write the stats to the database if they are not kept for a reload
+    if not stats_snapshot.save():
+        for player in player_dictionary.values():
+            stats_store.add(player)
+    stats_store.close()
+
+
+# =============================================================================
+# >> PROFILING
+# =============================================================================
+# Profile sending stats along with each renderer
+profiler.method(
+    PlayerStats,
+    "send_stats",
+    "send_chat_stats",
+    "send_menu_stats",
+    "send_interactive_menu",
+)
 
 
 # =============================================================================
 # >> GAME EVENTS
 # =============================================================================
 @Event("player_hurt")
+@profiler.event("player_hurt")
 def _player_hurt(game_event):
     """Add the stats for the given attack."""
+    # Is this a bot attacking a bot?
+    if int(skip_bot_pairs) and bot_userids.is_bot_pair(
+        game_event["attacker"],
+        game_event["userid"],
+    ):
+        # Still add the hit to both teams' totals
+        attacker_team = bot_userids[game_event["attacker"]]
+        victim_team = bot_userids[game_event["userid"]]
+        if attacker_team != victim_team:
+            team_totals.add_hit(
+                attacker_team,
+                victim_team,
+                game_event["dmg_health"],
+                game_event["hitgroup"],
+            )
+        return
+
     # Get the attacker
     attacker, victim = _get_attacker_and_victim(game_event)
 
@@ -28,88 +136,355 @@ def _player_hurt(game_event):
 
     damage = game_event["dmg_health"]
     hitgroup = game_event["hitgroup"]
+    weapon = weapon_ids[game_event["weapon"]]
+
+    # Add the hit to the attacker's weapon stats
+    attacker.weapons.add_hit(weapon, damage)
 
     # Add the damage stats to the attacker's dictionary for the victim
-    given = attacker.given[victim.name]
-    given.damage += damage
-    given.hits += 1
-    given.hitgroups[hitgroup] += 1
+    attacker.add_given(victim.userid, damage, hitgroup)
 
     # Add the damage stats to the victim's dictionary for the attacker
-    taken = victim.taken[attacker.name]
-    taken.damage += damage
-    taken.hits += 1
-    taken.hitgroups[hitgroup] += 1
+    victim.taken.add_hit(attacker.userid, damage, hitgroup)
+
+    # Add the damage to the attacker's leaderboard totals
+    round_leaderboard.add_damage(attacker.userid, damage)
+
+    # Add the hit to both teams' totals
+    team_totals.add_hit(attacker.team, victim.team, damage, hitgroup)
+
+    # Add the hit to the victim's timeline
+    if int(hit_timeline_size):
+        hit_timelines[victim.userid].add(
+            tick=global_vars.tick_count,
+            attacker=attacker.userid,
+            weapon=weapon,
+            hitgroup=hitgroup,
+            damage=damage,
+            health=game_event["health"],
+        )
+
+    # Add the hit to the attacker's heatmap counters for the round
+    if int(heatmap_stats) and stats_heatmap.available and not attacker.is_bot:
+        stats_heatmap.add_hit(attacker, weapon, hitgroup, damage)
 
 
 @Event("player_death")
+@profiler.event("player_death")
 def _player_death(game_event):
     """Send victim their stats and add the victim to the attacker's kills."""
+    # Is this a bot killing a bot or killing itself?
+    if int(skip_bot_pairs) and bot_userids.is_bot_pair(
+        game_event["attacker"] or game_event["userid"],
+        game_event["userid"],
+    ):
+        # Still add the kill to the attacker's team totals
+        attacker_team = bot_userids[
+            game_event["attacker"] or game_event["userid"]
+        ]
+        if attacker_team != bot_userids[game_event["userid"]]:
+            team_totals.add_kill(
+                attacker_team,
+                headshot=game_event["headshot"],
+            )
+        return
+
     attacker, victim = _get_attacker_and_victim(game_event)
 
     # Was this a good kill (non-team/non-suicide)?
     if isinstance(attacker, PlayerStats):
 
+        # Only use the entities for the information not cached in the stats
+        attacker_entity = Player(attacker.index)
+        health = attacker_entity.health
         headshot = game_event["headshot"]
         weapon = game_event["weapon"]
-        distance = attacker.origin.get_distance(victim.origin)
+        distance = attacker_entity.origin.get_distance(
+            Player(victim.index).origin,
+        )
 
         # Add the kill stats to the attacker's dictionary for the victim
-        kills = attacker.killed[victim.name]
-        kills.kills += 1
-        kills.headshot = headshot
-        kills.weapon = weapon
-        kills.distance = distance
+        weapon_id = weapon_ids[weapon]
+        attacker.add_kill(victim.userid).add(
+            weapon_id,
+            distance,
+            headshot=headshot,
+        )
+        attacker.weapons.add_kill(weapon_id)
+        round_leaderboard.add_kill(attacker.userid, headshot=headshot)
+        team_totals.add_kill(attacker.team, headshot=headshot)
 
         # Send the victim their victim stats
         victim.send_stats(
-            kill_type="Killer Alive" if attacker.health > 0 else "Killer Dead",
+            kill_type="Killer Alive" if health > 0 else "Killer Dead",
             attacker_name=attacker.name,
             headshot=headshot,
             weapon=weapon,
             distance=distance,
-            health=attacker.health,
+            health=health,
         )
 
     # Was this a suicide?
     elif attacker is None:
-        victim.send_stats(
+        player_dictionary[game_event["userid"]].send_stats(
             kill_type="Suicide",
         )
 
     # Was this a team-kill?
     else:
         victim.send_stats(
-            kill_type="Team-Killed",
+            kill_type="Team Killed",
             attacker_name=attacker,
         )
 
 
+@Event("weapon_fire")
+@profiler.event("weapon_fire")
+def _weapon_fire(game_event):
+    """Add the shot to the player's weapon stats."""
+    # Only humans ever see their own accuracy
+    userid = game_event["userid"]
+    if int(skip_bot_pairs) and userid in bot_userids:
+        return
+
+    player_dictionary[userid].weapons.add_shot(
+        weapon_ids[game_event["weapon"]],
+    )
+
+
+@Event("player_connect")
+@profiler.event("player_connect")
+def _player_connect(game_event):
+    """Store the userid of bots as they join."""
+    if game_event["networkid"] == "BOT":
+        bot_userids.add(game_event["userid"])
+
+
 @Event("player_spawn")
+@profiler.event("player_spawn")
 def _player_spawn(game_event):
-    """Remove the player's stats when they spawn."""
-    del player_dictionary[game_event["userid"]]
+    """Store and remove the player's stats when they spawn."""
+    userid = game_event["userid"]
+    player = player_dictionary.pop(userid, None)
+    if player is not None:
+        player.close_interactive_menu()
+        stats_store.add(player)
+    hit_timelines.reset(userid)
+    load_shedder.deferred.pop(userid, None)
+
+
+@Event("player_disconnect")
+@profiler.event("player_disconnect")
+def _player_disconnect(game_event):
+    """Store and remove the player's stats and all stats against them."""
+    userid = game_event["userid"]
+    player = player_dictionary.pop(userid, None)
+    if player is not None:
+        stats_store.add(player)
+    player_dictionary.remove_opponent(userid)
+    del hit_timelines[userid]
+    round_leaderboard.remove(userid)
+    bot_userids.pop(userid, None)
+    load_shedder.deferred.pop(userid, None)
+
+
+@Event("player_team")
+@profiler.event("player_team")
+def _player_team(game_event):
+    """Update the player's cached team."""
+    player_dictionary.set_team(game_event["userid"], game_event["team"])
+    bot_userids.set_team(game_event["userid"], game_event["team"])
+
+
+@Event("player_changename")
+@profiler.event("player_changename")
+def _player_changename(game_event):
+    """Update the player's cached name."""
+    player_dictionary.set_name(game_event["userid"], game_event["newname"])
 
 
 @Event("round_start")
+@profiler.event("round_start")
 def _round_start(game_event):
     """Clear the player dictionary."""
+    # Send any stats still queued or deferred from the previous round
+    _queue_deferred()
+    stats_scheduler.flush()
+
+    # Store all stats from the previous round
+    stats_heatmap.merge()
+    for player in player_dictionary.values():
+        stats_store.add(player)
     player_dictionary.clear()
+    round_leaderboard.clear()
+    team_totals.clear()
+    stats_store.start_round()
+    stats_export.publish()
 
 
 @Event("round_end")
+@profiler.event("round_end")
 def _round_end(game_event):
-    """Send stats to players who survived the round."""
+    """Send the leaderboard and stats to players who survived the round."""
     # Is the game commencing?
     if game_event["reason"] == 15:
         return
 
-    # Send all living human players their round stats
+    # Send everyone the round's top players
+    round_leaderboard.send()
+
+    # Send the dead and spectating players each team's totals
+    team_totals.send()
+    stats_export.publish()
+
+    # Queue the players whose stats were deferred when they died
+    _queue_deferred()
+
+    # Queue all living human players to be sent their round stats
     for player in PlayerIter(
         is_filters=["alive"],
         not_filters=["bot"],
     ):
-        player_dictionary[player.userid].send_stats()
+        stats_scheduler.add(player.userid)
+
+
+# =============================================================================
+# >> SERVER COMMANDS
+# =============================================================================
+@ServerCommand("vs_perf")
+def _vs_perf(command):
+    """Enable, disable, reset or print the handler timings."""
+    action = command[1] if command.arg_count else ""
+    if action == "on":
+        profiler.enable()
+    elif action == "off":
+        profiler.disable()
+    elif action == "reset":
+        profiler.reset()
+    else:
+        for line in profiler.iter_report():
+            echo_console(line)
+        profiler.reset()
+        return
+
+    echo_console(f"vs_perf: profiling {'on' if profiler.enabled else 'off'}")
+
+
+@ServerCommand("vs_memory")
+def _vs_memory(command):  # noqa: ARG001
+    """Print the number of stored entries and their size for each player."""
+    total_entries = total_size = 0
+    echo_console(f"{'userid':>7} {'entries':>8} {'bytes':>9}  name")
+    for userid, player in sorted(player_dictionary.items()):
+        entries, size = player.get_memory_usage()
+        total_entries += entries
+        total_size += size
+        echo_console(f"{userid:>7} {entries:>8} {size:>9}  {player.name}")
+
+    echo_console(
+        f"{len(player_dictionary)} players, {total_entries} entries, "
+        f"{total_size} bytes; {len(player_dictionary.names)} cached names, "
+        f"{len(stats_scheduler)} queued players, "
+        f"{stats_renderer.pending} pending renders "
+        f"({stats_renderer.inline} inline, "
+        f"{stats_renderer.offloaded} offloaded), "
+        f"{len(chat_output)} queued messages, "
+        f"{stats_store.dropped} dropped database writes",
+    )
+
+
+@ServerCommand("vs_load")
+def _vs_load(command):
+    """Print the load shedding level, the load and each level's count."""
+    if command.arg_count and command[1] == "reset":
+        for level in range(len(LEVEL_NAMES)):
+            load_shedder.counts[level] = 0
+
+    echo_console(
+        f"vs_load: level {LEVEL_NAMES[load_shedder.level]}, "
+        f"{load_shedder.frame_time:.2f} ms per tick, "
+        f"{load_shedder.plugin_time:.3f} ms sending stats per tick, "
+        f"{len(load_shedder.deferred)} deferred",
+    )
+    for level, name in enumerate(LEVEL_NAMES):
+        echo_console(f"{name:<16}{load_shedder.counts[level]:>9}")
+
+
+@ServerCommand("vs_record")
+def _vs_record(command):
+    """Start or stop recording events, or print the recording status."""
+    action = command[1] if command.arg_count else ""
+    if action == "on":
+        event_recorder.start()
+    elif action == "off":
+        event_recorder.stop()
+
+    echo_console(
+        f"vs_record: recording {'on' if event_recorder.recording else 'off'}"
+        f", {event_recorder.records} records, {event_recorder.dropped} "
+        f"dropped, last log {event_recorder.path}",
+    )
+
+
+@ServerCommand("vs_heatmap")
+def _vs_heatmap(command):
+    """Print the players or weapons with the highest headshot ratios."""
+    by_weapon = command.arg_count >= 1 and command[1] == "weapons"
+    try:
+        count = (
+            int(command[HEATMAP_COUNT_ARGUMENT])
+            if command.arg_count >= HEATMAP_COUNT_ARGUMENT
+            else DEFAULT_HEATMAP_COUNT
+        )
+        min_hits = (
+            int(command[HEATMAP_MIN_HITS_ARGUMENT])
+            if command.arg_count >= HEATMAP_MIN_HITS_ARGUMENT
+            else DEFAULT_HEATMAP_MIN_HITS
+        )
+    except ValueError:
+        echo_console("Usage: vs_heatmap [players|weapons] [count] [min hits]")
+        return
+
+    for line in stats_heatmap.iter_report(by_weapon, count, min_hits):
+        echo_console(line)
+
+
+# =============================================================================
+# >> LISTENERS
+# =============================================================================
+@OnClientSettingsChanged
+def _on_client_settings_changed(index):
+    """Clear the player's cached settings in case they changed them."""
+    del settings_cache[index]
+
+
+@OnClientDisconnect
+def _on_client_disconnect(index):
+    """Clear the player's cached settings and queued messages."""
+    del settings_cache[index]
+    chat_output.discard(index)
+
+
+@OnLevelInit
+def _on_level_init(map_name):  # noqa: ARG001
+    """Start a new event log for the new map if recording."""
+    event_recorder.restart()
+
+
+@OnLevelShutdown
+def _on_level_shutdown():
+    """Store and clear everything before the map changes."""
+    stats_scheduler.clear()
+    stats_renderer.clear()
+    load_shedder.reset()
+    chat_output.clear()
+    stats_heatmap.flush()
+    for player in player_dictionary.values():
+        stats_store.add(player)
+    player_dictionary.clear()
+    round_leaderboard.clear()
+    team_totals.clear()
+    settings_cache.clear()
 
 
 # =============================================================================
@@ -133,3 +508,9 @@ def _get_attacker_and_victim(game_event):
 
     # If all checks pass, count the attack/kill
     return attacker, victim
+
+
+def _queue_deferred():
+    """Queue the players whose stats were deferred to be sent."""
+    for userid, kill in load_shedder.pop_deferred():
+        stats_scheduler.add(userid, **kill)
@@ -0,0 +1,105 @@
+# ../victim_stats/weapons.py
+
+"""Interns weapon names and counts how each player uses them."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python
+from array import array
+
+# =============================================================================
+# >> ALL DECLARATION
+# =============================================================================
+__all__ = (
+    "WeaponCounters",
+    "weapon_ids",
+)
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class _WeaponIds(dict):
+    """Stores the id for each weapon name, with or without its prefix."""
+
+    def __init__(self):
+        """Create the list used to look up the name for each id."""
+        super().__init__()
+        self.names = []
+
+    def __missing__(self, weapon):
+        """Assign the next id to the weapon if it is new."""
+        name = weapon.removeprefix("weapon_")
+        value = self.get(name)
+        if value is None:
+            value = self[name] = len(self.names)
+            self.names.append(name)
+        self[weapon] = value
+        return value
+
+
+weapon_ids = _WeaponIds()
+
+
+class WeaponCounters:
+    """
+    Stores shots, hits, damage and kills in arrays indexed by weapon id.
+
+    The arrays are sized for every weapon known when they are created and
+    only grow when a weapon is seen for the first time on the server.
+    """
+
+    __slots__ = ("damage", "hits", "kills", "shots")
+
+    def __init__(self):
+        """Create the arrays for all currently known weapons."""
+        size = len(weapon_ids.names)
+        self.shots = array("L", [0]) * size
+        self.hits = array("L", [0]) * size
+        self.damage = array("L", [0]) * size
+        self.kills = array("L", [0]) * size
+
+    def add_shot(self, weapon):
+        """Add a shot fired with the weapon."""
+        try:
+            self.shots[weapon] += 1
+        except IndexError:
+            self._grow(weapon)
+            self.shots[weapon] += 1
+
+    def add_hit(self, weapon, damage):
+        """Add a hit and its damage with the weapon."""
+        try:
+            self.hits[weapon] += 1
+        except IndexError:
+            self._grow(weapon)
+            self.hits[weapon] += 1
+        self.damage[weapon] += damage
+
+    def add_kill(self, weapon):
+        """Add a kill with the weapon."""
+        try:
+            self.kills[weapon] += 1
+        except IndexError:
+            self._grow(weapon)
+            self.kills[weapon] += 1
+
+    def get(self, weapon):
+        """Return the shots, hits, damage and kills for the weapon."""
+        if weapon >= len(self.shots):
+            return 0, 0, 0, 0
+        return (
+            self.shots[weapon],
+            self.hits[weapon],
+            self.damage[weapon],
+            self.kills[weapon],
+        )
+
+    def _grow(self, weapon):
+        """Extend the arrays to include all currently known weapons."""
+        extra = array("L", [0]) * (
+            max(weapon + 1, len(weapon_ids.names)) - len(self.shots)
+        )
+        for counters in (self.shots, self.hits, self.damage, self.kills):
+            counters.extend(extra)
@@ -0,0 +1,3 @@
+# ../benchmarks/__init__.py
+
+"""Benchmarks that replay game events through the plugin with stubs."""
@@ -0,0 +1,685 @@
+# ../benchmarks/_stubs.py
+
+"""In-process stand-ins for the Source.Python modules used by the plugin."""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python
+import math
+import sys
+import tempfile
+from pathlib import Path, PosixPath
+from threading import Thread
+from types import ModuleType
+
+# =============================================================================
+# >> GLOBAL VARIABLES
+# =============================================================================
+ROOT_PATH = Path(__file__).resolve().parent.parent
+PLUGINS_PATH = ROOT_PATH / "addons" / "source-python" / "plugins"
+TRANSLATIONS_PATH = ROOT_PATH / "resource" / "source-python" / "translations"
+
+# Counters of everything the plugin sends to clients
+sent = {"saytext2": 0, "menus": 0}
+
+# Directory used as PLUGIN_DATA_PATH, which is temporary unless changed
+data_path = Path(tempfile.mkdtemp(prefix="victim_stats_"))
+
+# Factories for the client convar values given to each new client
+client_convars = {}
+
+
+# =============================================================================
+# >> SERVER STATE
+# =============================================================================
+class Vector:
+    """Minimal Source.Python Vector."""
+
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x, self.y, self.z = x, y, z
+
+    def get_distance(self, other):
+        return math.dist((self.x, self.y, self.z), (other.x, other.y, other.z))
+
+
+class FakeClient:
+    """A connected client on the fake server."""
+
+    def __init__(self, index, userid, name, team, *, bot=False):
+        self.index = index
+        self.userid = userid
+        self.name = name
+        self.team = team
+        self.bot = bot
+        self.health = 100
+        self.origin = Vector()
+        self.language = "en"
+        self.convars = {
+            name: factory() for name, factory in client_convars.items()
+        }
+
+    @property
+    def dead(self):
+        return self.health <= 0
+
+    def is_fake_client(self):
+        return self.bot
+
+
+class FakeServer:
+    """Holds all clients that are 'connected' to the fake server."""
+
+    def __init__(self):
+        self.clients = {}
+        self.userids = {}
+
+    def add(self, client):
+        self.clients[client.index] = client
+        self.userids[client.userid] = client
+
+    def remove(self, userid):
+        client = self.userids.pop(userid)
+        del self.clients[client.index]
+
+    def clear(self):
+        self.clients.clear()
+        self.userids.clear()
+
+
+server = FakeServer()
+
+
+class GlobalVars:
+    """Stand-in for engines.server.global_vars."""
+
+    def __init__(self):
+        self.tick_count = 0
+        self.interval_per_tick = 1 / 128
+        self.map_name = "de_dust2"
+
+
+global_vars = GlobalVars()
+
+
+class GameRules:
+    """Stand-in for the cs_gamerules entity."""
+
+    def __init__(self):
+        self.round_start_time = 0.0
+
+    def get_network_property_float(self, name):
+        return self.round_start_time
+
+
+game_rules = GameRules()
+
+
+class Entity:
+    """Stand-in for entities.entity.Entity, which only finds game rules."""
+
+    @staticmethod
+    def find(classname):
+        return game_rules if classname == "cs_gamerules" else None
+
+
+class DataPath(PosixPath):
+    """Stand-in for the path.Path objects used by Source.Python's paths."""
+
+    def makedirs_p(self):
+        self.mkdir(parents=True, exist_ok=True)
+        return self
+
+    def isfile(self):
+        return self.is_file()
+
+
+# =============================================================================
+# >> MODULE HELPERS
+# =============================================================================
+def _module(name, **attributes):
+    module = ModuleType(name)
+    module.__dict__.update(attributes)
+    sys.modules[name] = module
+    parent, child = name.rpartition(".")[::2]
+    if parent:
+        if parent not in sys.modules:
+            _module(parent)
+        setattr(sys.modules[parent], child, module)
+    return module
+
+
+def _client_from_userid(userid):
+    try:
+        return server.userids[userid]
+    except KeyError:
+        msg = f"Invalid userid '{userid}'."
+        raise ValueError(msg) from None
+
+
+def _client_from_index(index):
+    try:
+        return server.clients[index]
+    except KeyError:
+        msg = f"Invalid index '{index}'."
+        raise ValueError(msg) from None
+
+
+# =============================================================================
+# >> TRANSLATIONS
+# =============================================================================
+class TranslationStrings(dict):
+    """Stand-in for translations.strings.TranslationStrings."""
+
+    def __init__(self):
+        super().__init__()
+        self.tokens = {}
+
+    def get_language(self, language):
+        if language in self:
+            return language
+        if "en" in self:
+            return "en"
+        return None
+
+    def get_string(self, language=None, **tokens):
+        language = self.get_language(language or "en")
+        if language is None:
+            return ""
+        tokens.update(self.tokens)
+        plain = {
+            token_name: token for token_name, token in tokens.items()
+            if not isinstance(token, TranslationStrings)
+        }
+        for token_name, token in tokens.items():
+            if isinstance(token, TranslationStrings):
+                tokens[token_name] = token.get_string(language, **plain)
+        return self[language].format(**tokens)
+
+
+class LangStrings(dict):
+    """Stand-in for translations.strings.LangStrings parsing the ini files."""
+
+    def __init__(self, infile):
+        super().__init__()
+        section = None
+        path = TRANSLATIONS_PATH / f"{infile}.ini"
+        lines = path.read_text(encoding="utf-8").splitlines()
+        for line in map(str.strip, lines):
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("[") and line.endswith("]"):
+                section = self[line[1:-1]] = TranslationStrings()
+                continue
+            language, value = line.partition("=")[::2]
+            section[language.strip()] = value.strip()[1:-1]
+
+
+# =============================================================================
+# >> EVENTS
+# =============================================================================
+class GameEvent(dict):
+    """Stand-in for events.GameEvent."""
+
+    def __init__(self, name, variables):
+        super().__init__(variables)
+        self.name = name
+
+
+class EventManager(dict):
+    """Stand-in for events.manager.event_manager."""
+
+    def register_for_event(self, event_name, callback):
+        self.setdefault(event_name, []).append(callback)
+
+    def unregister_for_event(self, event_name, callback):
+        self[event_name].remove(callback)
+
+    def fire(self, event_name, **variables):
+        callbacks = self.get(event_name)
+        if not callbacks:
+            return
+        game_event = GameEvent(event_name, variables)
+        for callback in callbacks:
+            callback(game_event)
+
+
+event_manager = EventManager()
+
+
+class Event:
+    """Stand-in for the events.Event decorator."""
+
+    def __init__(self, *event_names):
+        self.event_names = event_names
+
+    def __call__(self, callback):
+        for event_name in self.event_names:
+            event_manager.register_for_event(event_name, callback)
+        return callback
+
+
+# =============================================================================
+# >> COMMANDS
+# =============================================================================
+class Command(list):
+    """Stand-in for commands.Command."""
+
+    @property
+    def arg_count(self):
+        return len(self) - 1
+
+
+server_commands = {}
+
+
+class ServerCommand:
+    """Stand-in for the commands.server.ServerCommand decorator."""
+
+    def __init__(self, *names, description=""):
+        self.names = names
+
+    def __call__(self, callback):
+        for name in self.names:
+            server_commands[name] = callback
+        return callback
+
+
+def run_server_command(*args):
+    """Run the server command with the given arguments."""
+    server_commands[args[0]](Command(args))
+
+
+# =============================================================================
+# >> LISTENERS
+# =============================================================================
+class _ListenerManager(list):
+    """Stand-in for a listener manager, calling each callback on notify."""
+
+    def notify(self, *args):
+        for callback in list(self):
+            callback(*args)
+
+    def register_listener(self, callback):
+        self.append(callback)
+
+    def unregister_listener(self, callback):
+        self.remove(callback)
+
+
+listeners = {}
+
+
+def _listener(name):
+    manager = listeners[name] = _ListenerManager()
+
+    class _Decorator:
+        def __init__(self, callback):
+            self.callback = callback
+            manager.append(callback)
+
+        def __call__(self, *args):
+            return self.callback(*args)
+
+    _Decorator.__name__ = name
+    _Decorator.manager = manager
+    return _Decorator
+
+
+_LISTENER_NAMES = (
+    "OnClientActive",
+    "OnClientDisconnect",
+    "OnClientSettingsChanged",
+    "OnLevelInit",
+    "OnLevelShutdown",
+    "OnTick",
+)
+
+
+# =============================================================================
+# >> PLAYERS
+# =============================================================================
+class Player:
+    """Stand-in for players.entity.Player."""
+
+    def __init__(self, index):
+        self._client = _client_from_index(index)
+        self.index = index
+
+    @classmethod
+    def from_userid(cls, userid):
+        return cls(_client_from_userid(userid).index)
+
+    @property
+    def userid(self):
+        return self._client.userid
+
+    @property
+    def name(self):
+        return self._client.name
+
+    @property
+    def team(self):
+        return self._client.team
+
+    @property
+    def health(self):
+        return self._client.health
+
+    @property
+    def origin(self):
+        return self._client.origin
+
+    @property
+    def dead(self):
+        return self._client.dead
+
+    @property
+    def language(self):
+        return self._client.language
+
+    def is_fake_client(self):
+        return self._client.bot
+
+
+def _player_iter(is_filters=(), not_filters=()):
+    filters = {
+        "alive": lambda client: not client.dead,
+        "dead": lambda client: client.dead,
+        "bot": lambda client: client.bot,
+        "human": lambda client: not client.bot,
+    }
+    for client in list(server.clients.values()):
+        if not all(filters[item](client) for item in is_filters):
+            continue
+        if any(filters[item](client) for item in not_filters):
+            continue
+        yield Player(client.index)
+
+
+# =============================================================================
+# >> MESSAGES AND MENUS
+# =============================================================================
+class SayText2:
+    """Stand-in for messages.SayText2."""
+
+    def __init__(self, message="", index=0, *, chat=False):
+        self.message = message
+
+    def send(self, *indexes):
+        sent["saytext2"] += 1
+
+
+class SimpleOption:
+    """Stand-in for menus.SimpleOption."""
+
+    def __init__(
+        self, choice_index, text, value=None, *, highlight=True,
+        selectable=True,
+    ):
+        self.choice_index = choice_index
+        self.text = text
+        self.value = value
+        self.selectable = selectable
+
+
+class PagedOption:
+    """Stand-in for menus.PagedOption."""
+
+    def __init__(self, text, value=None, *, highlight=True, selectable=True):
+        self.text = text
+        self.value = value
+        self.selectable = selectable
+
+
+class _BaseMenu(list):
+    def __init__(
+        self, data=None, select_callback=None, build_callback=None,
+        close_callback=None, **kwargs,
+    ):
+        super().__init__(data or [])
+        self.select_callback = select_callback
+        self.build_callback = build_callback
+        self.close_callback = close_callback
+        self.__dict__.update(kwargs)
+
+    def send(self, *indexes):
+        sent["menus"] += 1
+
+    def close(self, *indexes):
+        pass
+
+
+class SimpleMenu(_BaseMenu):
+    """Stand-in for menus.SimpleMenu."""
+
+
+class PagedMenu(_BaseMenu):
+    """Stand-in for menus.PagedMenu."""
+
+
+# =============================================================================
+# >> SETTINGS
+# =============================================================================
+class StringSetting(dict):
+    """Stand-in for settings.types.StringSetting."""
+
+    def __init__(self, name, default, text=None, prefix=""):
+        super().__init__()
+        self.name = name
+        self.default = default
+        self.text = text
+        self.convar = prefix + name.lower().replace(" ", "_")
+        self.storage = {}
+        self.menu = PagedMenu(select_callback=self._chosen_value)
+
+    def add_option(self, name, text=None):
+        self[name] = text
+
+    def get_setting(self, index):
+        client = _client_from_index(index)
+        value = client.convars.get(self.convar)
+        if value in self:
+            return value
+        return self.storage.get(client.userid, self.default)
+
+    def _chosen_value(self, menu, index, option):
+        self.storage[_client_from_index(index).userid] = option.value
+
+
+class PlayerSettings(dict):
+    """Stand-in for settings.player.PlayerSettings."""
+
+    def __init__(self, name, prefix, text=None):
+        super().__init__()
+        self.name = name
+        self.prefix = prefix if prefix.endswith("_") else prefix + "_"
+        self.text = text
+
+    def add_string_setting(self, name, default, text=None):
+        setting = self[name] = StringSetting(name, default, text, self.prefix)
+        return setting
+
+    def unregister_settings(self):
+        self.clear()
+
+
+# =============================================================================
+# >> CONFIGURATION
+# =============================================================================
+class _CvarManager:
+    """Stand-in for the cvar objects created by ConfigManager.cvar."""
+
+    def __init__(self, name, default=0, description="", min_value=None,
+                 max_value=None):
+        self.name = name
+        self.default = default
+        self.value = default
+        self.description = description
+        self.Options = []
+        self.Notes = []
+
+    def __int__(self):
+        return int(self.value)
+
+    def __float__(self):
+        return float(self.value)
+
+    def __bool__(self):
+        return bool(int(self.value))
+
+    def get_int(self):
+        return int(self.value)
+
+    def get_float(self):
+        return float(self.value)
+
+    def get_bool(self):
+        return bool(int(self.value))
+
+    def get_string(self):
+        return str(self.value)
+
+    def set_int(self, value):
+        self.value = int(value)
+
+    def set_float(self, value):
+        self.value = float(value)
+
+    def set_string(self, value):
+        self.value = value
+
+
+cvars = {}
+
+
+class ConfigManager:
+    """Stand-in for config.manager.ConfigManager."""
+
+    def __init__(
+        self, filepath, cvar_prefix="", indention=3, max_line_length=79,
+    ):
+        self.prefix = cvar_prefix
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def cvar(self, name, default=0, description="", *, flags=0,
+             min_value=None, max_value=None):
+        name = self.prefix + name
+        cvar = cvars[name] = _CvarManager(
+            name, default, description, min_value, max_value,
+        )
+        return cvar
+
+    def section(self, *args, **kwargs):
+        pass
+
+    def text(self, *args, **kwargs):
+        pass
+
+
+class _PluginInfo:
+    def __init__(self, name):
+        self.name = name
+        self.verbose_name = "Victim Stats"
+        self.version = "1.0.0"
+
+
+class _PluginManager:
+    def get_plugin_info(self, name):
+        return _PluginInfo(name.split(".")[0])
+
+
+# =============================================================================
+# >> INSTALLATION
+# =============================================================================
+def unload_plugin(name):
+    """
+    Unregister everything the plugin registered and forget its modules.
+
+    This mirrors Source.Python unloading a plugin, so that importing the
+    plugin again behaves like a reload on a running server.
+    """
+    def belongs(callback):
+        module = getattr(callback, "__module__", None) or ""
+        return module == name or module.startswith(f"{name}.")
+
+    for callbacks in event_manager.values():
+        callbacks[:] = [item for item in callbacks if not belongs(item)]
+    for manager in listeners.values():
+        manager[:] = [item for item in manager if not belongs(item)]
+    for command_name, callback in list(server_commands.items()):
+        if belongs(callback):
+            del server_commands[command_name]
+    for module_name in list(sys.modules):
+        if module_name == name or module_name.startswith(f"{name}."):
+            del sys.modules[module_name]
+
+
+def install():
+    """Install all stub modules and make the plugin importable."""
+    _module("core", GAME_NAME="cstrike", echo_console=print)
+    _module("commands.server", ServerCommand=ServerCommand)
+    _module(
+        "colors",
+        DARK_BLUE="\x0700008B", DARK_RED="\x078B0000", GRAY="\x07808080",
+        LIGHT_BLUE="\x07ADD8E6", LIGHT_RED="\x07FF6666", ORANGE="\x07FFA500",
+        YELLOW="\x07FFFF00",
+    )
+    _module("config.manager", ConfigManager=ConfigManager)
+    _module("plugins.manager", plugin_manager=_PluginManager())
+    _module(
+        "translations.strings",
+        LangStrings=LangStrings,
+        TranslationStrings=TranslationStrings,
+    )
+    _module("events", Event=Event, GameEvent=GameEvent)
+    _module("events.manager", event_manager=event_manager)
+    _module("filters.players", PlayerIter=_player_iter)
+    _module("players.entity", Player=Player)
+    _module(
+        "players.helpers",
+        index_from_userid=lambda userid: _client_from_userid(userid).index,
+        userid_from_index=lambda index: _client_from_index(index).userid,
+        playerinfo_from_userid=_client_from_userid,
+        playerinfo_from_index=_client_from_index,
+        get_client_language=lambda index: _client_from_index(index).language,
+        uniqueid_from_playerinfo=lambda playerinfo: (
+            f"BOT_{playerinfo.name}" if playerinfo.bot
+            else f"STEAM_0:0:{playerinfo.userid}"
+        ),
+    )
+    _module("messages", SayText2=SayText2)
+    _module("engines.server", global_vars=global_vars)
+    _module("entities.entity", Entity=Entity)
+    _module("listeners.tick", GameThread=Thread)
+    _module("paths", PLUGIN_DATA_PATH=DataPath(data_path))
+    _module(
+        "menus",
+        PagedMenu=PagedMenu,
+        PagedOption=PagedOption,
+        SimpleMenu=SimpleMenu,
+        SimpleOption=SimpleOption,
+    )
+    _module("settings.player", PlayerSettings=PlayerSettings)
+    decorators = {name: _listener(name) for name in _LISTENER_NAMES}
+    _module(
+        "listeners",
+        **decorators,
+        **{
+            "on_" + "".join(
+                f"_{char.lower()}" if char.isupper() else char
+                for char in name[2:]
+            ).lstrip("_") + "_listener_manager": decorator.manager
+            for name, decorator in decorators.items()
+        },
+    )
+
+    if str(PLUGINS_PATH) not in sys.path:
+        sys.path.insert(0, str(PLUGINS_PATH))
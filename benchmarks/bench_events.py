@@ -0,0 +1,422 @@
+# ../benchmarks/bench_events.py
+
+"""
+Replays game event streams through the plugin without a game server.
+
+All Source.Python modules the plugin uses are replaced in-process by the
+stand-ins in _stubs.py, so the event handlers, renderers and tick
+listeners run exactly as they would on a server.
+
+Examples:
+    python benchmarks/bench_events.py
+    python benchmarks/bench_events.py --players 32 --bots 24 --rounds 50
+    python benchmarks/bench_events.py --save stream.jsonl
+    python benchmarks/bench_events.py --events stream.jsonl --allocations
+    python benchmarks/bench_events.py --events de_dust2_1700000000.vsr
+
+"""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python
+import argparse
+import json
+import random
+import sys
+import tracemalloc
+from collections import defaultdict
+from itertools import cycle
+from pathlib import Path
+from statistics import quantiles
+from time import perf_counter, perf_counter_ns
+
+# Benchmarks
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import _stubs
+
+# Plugin
+sys.path.insert(0, str(_stubs.PLUGINS_PATH))
+from victim_stats import event_log
+
+# =============================================================================
+# >> GLOBAL VARIABLES
+# =============================================================================
+# Relative chance of each hitgroup being hit
+_HITGROUP_WEIGHTS = {0: 2, 1: 12, 2: 35, 3: 20, 4: 7, 5: 7, 6: 8, 7: 8, 10: 1}
+
+# Weapons used by the synthetic players
+_WEAPONS = ("ak47", "m4a1", "awp", "deagle", "famas", "galil", "usp", "glock")
+
+# Teams the synthetic players are split between
+_TEAMS = (2, 3)
+
+# Round end reasons, excluding 15 (game commencing)
+_ROUND_END_REASONS = (7, 8, 12)
+
+
+# =============================================================================
+# >> STREAM GENERATION
+# =============================================================================
+def generate_stream(
+    *, players=64, bots=0, rounds=20, tick_rate=128, round_seconds=60,
+    shots_per_hit=3, team_damage=0.02, seed=0,
+):
+    """Return a synthetic list of (tick, event_name, variables) entries."""
+    rng = random.Random(seed)
+    hitgroups = list(_HITGROUP_WEIGHTS)
+    weights = list(_HITGROUP_WEIGHTS.values())
+    stream = []
+    tick = 0
+
+    # Connect everyone and split them between the two teams
+    teams = {}
+    for index in range(1, players + 1):
+        userid = index + 1
+        bot = index > players - bots
+        teams[userid] = _TEAMS[index % 2]
+        stream.append((tick, "player_connect", {
+            "userid": userid,
+            "index": index,
+            "name": f"{'Bot' if bot else 'Player'} {index}",
+            "networkid": "BOT" if bot else f"STEAM_0:0:{index}",
+        }))
+        stream.append((tick, "player_team", {
+            "userid": userid,
+            "team": teams[userid],
+            "oldteam": 0,
+            "disconnect": False,
+        }))
+
+    round_ticks = tick_rate * round_seconds
+    for _ in range(rounds):
+        tick += tick_rate
+        stream.append((tick, "round_start", {}))
+        health = dict.fromkeys(teams, 100)
+        stream.extend(
+            (tick, "player_spawn", {"userid": userid}) for userid in teams
+        )
+
+        # Keep fighting until one team is eliminated or time runs out
+        end_tick = tick + round_ticks
+        while tick < end_tick:
+            tick += rng.randint(1, max(1, tick_rate // players))
+            alive = [userid for userid, value in health.items() if value > 0]
+            if len({teams[userid] for userid in alive}) < len(_TEAMS):
+                break
+
+            attacker, victim = rng.sample(alive, 2)
+            if teams[attacker] == teams[victim] and rng.random() > team_damage:
+                continue
+
+            weapon = rng.choice(_WEAPONS)
+            stream.extend(
+                (tick, "weapon_fire", {
+                    "userid": attacker,
+                    "weapon": weapon,
+                    "silenced": False,
+                })
+                for _ in range(shots_per_hit)
+            )
+
+            hitgroup = rng.choices(hitgroups, weights)[0]
+            damage = min(health[victim], rng.randint(8, 40) * (
+                4 if hitgroup == 1 else 1
+            ))
+            health[victim] -= damage
+            stream.append((tick, "player_hurt", {
+                "userid": victim,
+                "attacker": attacker,
+                "health": health[victim],
+                "armor": 0,
+                "weapon": weapon,
+                "dmg_health": damage,
+                "dmg_armor": 0,
+                "hitgroup": hitgroup,
+            }))
+            if not health[victim]:
+                stream.append((tick, "player_death", {
+                    "userid": victim,
+                    "attacker": attacker,
+                    "weapon": weapon,
+                    "headshot": hitgroup == 1,
+                }))
+
+        stream.append((tick, "round_end", {
+            "winner": rng.choice(_TEAMS),
+            "reason": rng.choice(_ROUND_END_REASONS),
+            "message": "",
+        }))
+        tick += tick_rate * 5
+
+    return stream
+
+
+def save_stream(stream, path):
+    """Write the stream to the given path as JSON lines."""
+    with Path(path).open("w", encoding="utf-8") as open_file:
+        open_file.writelines(
+            json.dumps({"tick": tick, "event": event_name, **variables})
+            + "\n"
+            for tick, event_name, variables in stream
+        )
+
+
+def load_stream(path):
+    """Return the stream stored as JSON lines or recorded by the plugin."""
+    with Path(path).open("rb") as open_file:
+        recorded = open_file.read(len(event_log.MAGIC)) == event_log.MAGIC
+    if recorded:
+        return list(event_log.read_events(path))
+
+    stream = []
+    with Path(path).open(encoding="utf-8") as open_file:
+        for line in open_file:
+            variables = json.loads(line)
+            stream.append(
+                (variables.pop("tick"), variables.pop("event"), variables),
+            )
+    return stream
+
+
+# =============================================================================
+# >> REPLAY
+# =============================================================================
+class Results:
+    """Stores the timings and allocations gathered during a replay."""
+
+    def __init__(self):
+        """Create the storage for the timings."""
+        self.timings = defaultdict(list)
+        self.rounds = []
+        self.events = 0
+        self.ticks = 0
+        self.elapsed = 0.0
+
+    def report(self):
+        """Print the gathered results."""
+        print(
+            f"{self.events} events and {self.ticks} ticks in "
+            f"{self.elapsed:.3f}s ({self.events / self.elapsed:,.0f} "
+            "events/sec)",
+        )
+        print(
+            f"{'handler':<20}{'calls':>9}{'total ms':>11}{'p50 us':>9}"
+            f"{'p90 us':>9}{'p99 us':>9}{'max us':>10}",
+        )
+        for name, values in sorted(self.timings.items()):
+            values_us = [value / 1000 for value in values]
+            if len(values_us) > 1:
+                p50, p90, p99 = (
+                    quantiles(values_us, n=100, method="inclusive")[i]
+                    for i in (49, 89, 98)
+                )
+            else:
+                p50 = p90 = p99 = values_us[0]
+            print(
+                f"{name:<20}{len(values):>9}{sum(values_us) / 1000:>11.2f}"
+                f"{p50:>9.1f}{p90:>9.1f}{p99:>9.1f}{max(values_us):>10.1f}",
+            )
+        print(
+            f"messages: {_stubs.sent['saytext2']} SayText2, "
+            f"{_stubs.sent['menus']} menus",
+        )
+        if self.rounds:
+            blocks = [value[0] for value in self.rounds]
+            peaks = [value[1] for value in self.rounds]
+            print(
+                f"allocations per round: {sum(blocks) / len(blocks):,.0f} "
+                f"net blocks, {sum(peaks) / len(peaks) / 1024:,.1f} KiB "
+                "average peak",
+            )
+
+
+def replay(stream, *, allocations=False, seed=0):
+    """Replay the stream through the plugin and return the results."""
+    rng = random.Random(seed)
+    server = _stubs.server
+    event_manager = _stubs.event_manager
+    on_tick = _stubs.listeners["OnTick"]
+    global_vars = _stubs.global_vars
+    results = Results()
+    timings = results.timings
+    current_tick = global_vars.tick_count
+
+    if allocations:
+        tracemalloc.start()
+
+    start = perf_counter()
+    for tick, event_name, variables in stream:
+
+        # Run every tick between the previous event and this one
+        while current_tick < tick:
+            current_tick += 1
+            global_vars.tick_count = current_tick
+            if on_tick:
+                begin = perf_counter_ns()
+                on_tick.notify()
+                timings["OnTick"].append(perf_counter_ns() - begin)
+            results.ticks += 1
+
+        _apply_state(server, event_name, variables, rng)
+
+        if allocations and event_name == "round_start":
+            blocks = sys.getallocatedblocks()
+            tracemalloc.reset_peak()
+
+        begin = perf_counter_ns()
+        event_manager.fire(event_name, **variables)
+        timings[event_name].append(perf_counter_ns() - begin)
+        results.events += 1
+
+        if allocations and event_name == "round_end":
+            results.rounds.append(
+                (
+                    sys.getallocatedblocks() - blocks,
+                    tracemalloc.get_traced_memory()[1],
+                ),
+            )
+
+        if event_name == "player_disconnect":
+            server.remove(variables["userid"])
+
+    results.elapsed = perf_counter() - start
+    if allocations:
+        tracemalloc.stop()
+
+    return results
+
+
+def _apply_state(server, event_name, variables, rng):
+    """Update the fake server's state to match the upcoming event."""
+    if event_name == "round_start":
+        global_vars = _stubs.global_vars
+        _stubs.game_rules.round_start_time = (
+            global_vars.tick_count * global_vars.interval_per_tick
+        )
+        return
+
+    if event_name == "player_connect":
+        server.add(
+            _stubs.FakeClient(
+                index=variables["index"],
+                userid=variables["userid"],
+                name=variables["name"],
+                team=0,
+                bot=variables["networkid"] == "BOT",
+            ),
+        )
+        return
+
+    client = server.userids.get(variables.get("userid"))
+    if client is None:
+        return
+
+    if event_name == "player_team":
+        client.team = variables["team"]
+
+    elif event_name == "player_changename":
+        client.name = variables["newname"]
+
+    elif event_name == "player_spawn":
+        client.health = 100
+        client.origin = _stubs.Vector(
+            rng.uniform(-3000, 3000),
+            rng.uniform(-3000, 3000),
+            rng.uniform(-200, 200),
+        )
+
+    elif event_name == "player_hurt":
+        client.health = variables["health"]
+
+    # Recorded deaths store where both players were
+    elif event_name == "player_death" and "victim_origin" in variables:
+        client.origin = _stubs.Vector(*variables["victim_origin"])
+        attacker = server.userids.get(variables["attacker"])
+        if attacker is not None:
+            attacker.origin = _stubs.Vector(*variables["attacker_origin"])
+
+
+# =============================================================================
+# >> MAIN
+# =============================================================================
+def load_plugin(cvars=()):
+    """
+    Install the stubs, import the plugin and call its load function.
+
+    The given NAME=VALUE convars are set before the plugin is loaded.
+    """
+    _stubs.install()
+    from victim_stats import victim_stats  # noqa: PLC0415
+
+    for item in cvars:
+        name, value = item.partition("=")[::2]
+        _stubs.cvars[name].set_string(value)
+
+    victim_stats.load()
+    return victim_stats
+
+
+def main(argv=None):
+    """Parse the arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=64)
+    parser.add_argument("--bots", type=int, default=0)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--tick-rate", type=int, default=128)
+    parser.add_argument("--round-seconds", type=int, default=60)
+    parser.add_argument("--shots-per-hit", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--display-types",
+        default="1,2,3,4,5",
+        help="comma separated display types to give the human players",
+    )
+    parser.add_argument(
+        "--cvar",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="set a plugin convar before replaying, e.g. vs_skip_bot_pairs=1",
+    )
+    parser.add_argument(
+        "--events",
+        help="replay a JSON lines event stream or a recorded event log",
+    )
+    parser.add_argument("--save", help="save the generated event stream")
+    parser.add_argument(
+        "--allocations",
+        action="store_true",
+        help="trace allocations per round (slows down the timings)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.events:
+        stream = load_stream(args.events)
+    else:
+        stream = generate_stream(
+            players=args.players,
+            bots=args.bots,
+            rounds=args.rounds,
+            tick_rate=args.tick_rate,
+            round_seconds=args.round_seconds,
+            shots_per_hit=args.shots_per_hit,
+            seed=args.seed,
+        )
+
+    if args.save:
+        save_stream(stream, args.save)
+
+    victim_stats = load_plugin(args.cvar)
+
+    # Give the human players a spread of display types
+    display_types = cycle(args.display_types.split(","))
+    _stubs.client_convars["vs_display_type"] = lambda: next(display_types)
+
+    results = replay(stream, allocations=args.allocations, seed=args.seed)
+    victim_stats.unload()
+    results.report()
+
+
+if __name__ == "__main__":
+    main()
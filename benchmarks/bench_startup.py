@@ -0,0 +1,125 @@
+# ../benchmarks/bench_startup.py
+
+"""
+Measures how long the plugin takes to load, unload and reload.
+
+The first load imports everything cold. Each reload after that unloads
+the plugin's modules the same way Source.Python does and imports them
+again, which is what happens when the plugin is reloaded on a live map.
+With --players, a partial round is replayed first so that every unload
+and load also saves and restores that round's stats.
+
+Examples:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --reloads 100 --players 32 --bots 8
+
+"""
+
+# =============================================================================
+# >> IMPORTS
+# =============================================================================
+# Python
+import argparse
+import sys
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+
+# Benchmarks
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import _stubs
+import bench_events
+
+
+# =============================================================================
+# >> CLASSES
+# =============================================================================
+class StartupTimings:
+    """Stores the time taken by each step of every load in milliseconds."""
+
+    _STEPS = ("import", "load", "unload")
+
+    def __init__(self):
+        """Create the storage for each step."""
+        self.steps = {step: [] for step in self._STEPS}
+        self.restored = []
+
+    def report(self):
+        """Print the cold timings followed by the reload timings."""
+        print(f"{'step':<12}{'cold ms':>10}{'reload ms':>11}{'max ms':>9}")
+        for step, values in self.steps.items():
+            reloads = values[1:] or values
+            print(
+                f"{step:<12}{values[0]:>10.2f}{median(reloads):>11.2f}"
+                f"{max(reloads):>9.2f}",
+            )
+        if any(self.restored):
+            print(f"players restored per load: {max(self.restored)}")
+
+
+# =============================================================================
+# >> FUNCTIONS
+# =============================================================================
+def load_once(timings):
+    """Import and load the plugin and return its main module."""
+    start = perf_counter()
+    from victim_stats import victim_stats  # noqa: PLC0415
+    imported = perf_counter()
+    victim_stats.load()
+    loaded = perf_counter()
+
+    from victim_stats.players import player_dictionary  # noqa: PLC0415
+    timings.restored.append(len(player_dictionary))
+    timings.steps["import"].append((imported - start) * 1000)
+    timings.steps["load"].append((loaded - imported) * 1000)
+    return victim_stats
+
+
+def unload_once(victim_stats, timings):
+    """Unload the plugin and forget all of its modules."""
+    start = perf_counter()
+    victim_stats.unload()
+    timings.steps["unload"].append((perf_counter() - start) * 1000)
+    _stubs.unload_plugin("victim_stats")
+
+
+def main(argv=None):
+    """Parse the arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reloads", type=int, default=20)
+    parser.add_argument("--players", type=int, default=0)
+    parser.add_argument("--bots", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    _stubs.install()
+    timings = StartupTimings()
+    victim_stats = load_once(timings)
+
+    # Fill in the stats of a round that is still being played
+    if args.players:
+        stream = bench_events.generate_stream(
+            players=args.players,
+            bots=args.bots,
+            rounds=1,
+            tick_rate=64,
+            round_seconds=60,
+            shots_per_hit=3,
+            seed=args.seed,
+        )
+        round_end = next(
+            position for position, (_, event_name, _) in enumerate(stream)
+            if event_name == "round_end"
+        )
+        bench_events.replay(stream[:round_end], seed=args.seed)
+
+    for _ in range(args.reloads):  # noqa: B007
+        unload_once(victim_stats, timings)
+        victim_stats = load_once(timings)
+
+    unload_once(victim_stats, timings)
+    timings.report()
+
+
+if __name__ == "__main__":
+    main()